@@ -1,5 +1,6 @@
 # app.py
 import os
+import time
 from typing import Any, Dict, Optional, Tuple, List
 from collections import deque
 
@@ -10,26 +11,39 @@ from renderer import Renderer, make_backrooms_wall_texture
 from audio_system import AudioSystem
 from world import World
 from states import State, MenuState
+from present import PRESENT_BACKENDS, SoftwarePresenter, create_presenter
+from perf import PERF, PerfOverlay
 from pathfinding import DIRS4
 
 
 class App:
-    def __init__(self) -> None:
+    def __init__(self, cfg: Optional[RuntimeConfig] = None) -> None:
         pygame.init()
 
-        self.cfg = RuntimeConfig()
-        self.load_config()
+        # явный cfg (benchmark и т.п.) не читает и не трогает settings.json
+        if cfg is None:
+            self.cfg = RuntimeConfig()
+            self.load_config()
+        else:
+            self.cfg = cfg
 
         self.show_minimap = False
 
+        self.presenter = create_presenter(self.cfg.present_backend, "ESCAPE FROM FAMCS")
         self.screen = self._create_screen()
-        pygame.display.set_caption("ESCAPE FROM FAMCS")
 
         self.clock = pygame.time.Clock()
         self.running = True
 
+        # фиксированный шаг: номер шага и доля до следующего (для интерполяции в draw)
+        self.sim_tick = 0
+        self.render_alpha = 1.0
+
+        # запись ввода для replay.py (main.py --record)
+        self.recorder = None
+
         # Assets
-        self.wall_tex = make_backrooms_wall_texture(C.TEXTURE_SIZE)
+        self.wall_tex = make_backrooms_wall_texture(C.TEXTURE_SIZE, C.TEXTURE_SEED, self._cache_dir())
         self.monster_img = self._load_image_safe(C.MONSTER_FILE, alpha=False, convert=True, scale=(C.TEXTURE_SIZE, C.TEXTURE_SIZE))
         self.heart_img = self._load_image_safe(C.HEART_IMG, alpha=True)
         self.zachet_img = self._load_image_safe(C.ZACHET_IMG, alpha=True)
@@ -57,21 +71,43 @@ class App:
             self.door_img,
             self.victory_img,
             self.end_img,
+            cache_dir=self._cache_dir(),
+            presenter=self.presenter,
         )
+        self.renderer.set_dynamic_resolution(self.cfg.dynamic_resolution)
+        self.renderer.set_parallel(self.cfg.parallel_backend, self.cfg.render_strips)
+
+        # F3: оверлей производительности
+        self.perf_overlay = PerfOverlay(self.renderer.fonts.get(14))
 
         # State machine
         self.state: State = MenuState()
         self.state.on_enter(self)
 
     def _create_screen(self) -> pygame.Surface:
-        if self.cfg.fullscreen:
-            return pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
-        return pygame.display.set_mode(self.cfg.window_size)
+        try:
+            return self.presenter.create_screen(self.cfg.fullscreen, self.cfg.window_size)
+        except Exception as e:
+            if isinstance(self.presenter, SoftwarePresenter):
+                raise
+            print(f"Warning: {self.presenter.name} present backend failed ({e}). Using software.")
+            self.presenter = SoftwarePresenter(self.presenter.title)
+            if hasattr(self, "renderer"):
+                self.renderer.presenter = self.presenter
+            return self.presenter.create_screen(self.cfg.fullscreen, self.cfg.window_size)
 
     def apply_video_settings(self) -> None:
         self.screen = self._create_screen()
         self.renderer.set_screen(self.screen)
 
+    def start_recording(self, path: str) -> None:
+        from replay import Recorder
+        self.recorder = Recorder(path)
+
+    def set_mouse_captured(self, captured: bool) -> None:
+        self.presenter.set_mouse_grab(captured)
+        pygame.mouse.set_visible(not captured)
+
     def _config_dir(self) -> str:
         if getattr(__import__("sys"), "frozen", False):
             import sys
@@ -81,6 +117,9 @@ class App:
     def _config_path(self) -> str:
         return os.path.join(self._config_dir(), "settings.json")
 
+    def _cache_dir(self) -> str:
+        return os.path.join(self._config_dir(), "cache")
+
     def _savegame_path(self) -> str:
         return os.path.join(self._config_dir(), "savegame.json")
 
@@ -128,6 +167,16 @@ class App:
 
             self.cfg.invert_mouse_x = bool(data.get("invert_mouse_x", self.cfg.invert_mouse_x))
 
+            self.cfg.dynamic_resolution = bool(data.get("dynamic_resolution", self.cfg.dynamic_resolution))
+
+            self.cfg.parallel_backend = str(data.get("parallel_backend", self.cfg.parallel_backend))
+            self.cfg.render_strips = max(1, int(data.get("render_strips", self.cfg.render_strips)))
+            self.cfg.uncapped_fps = bool(data.get("uncapped_fps", self.cfg.uncapped_fps))
+
+            backend = str(data.get("present_backend", self.cfg.present_backend))
+            if backend in PRESENT_BACKENDS:
+                self.cfg.present_backend = backend
+
             mv = float(data.get("music_volume", self.cfg.music_volume))
             sv = float(data.get("sfx_volume", self.cfg.sfx_volume))
             self.cfg.music_volume = clamp(mv, 0.0, 1.0)
@@ -143,6 +192,11 @@ class App:
                 "fullscreen": self.cfg.fullscreen,
                 "window_size": list(self.cfg.window_size),
                 "invert_mouse_x": self.cfg.invert_mouse_x,
+                "present_backend": self.cfg.present_backend,
+                "dynamic_resolution": self.cfg.dynamic_resolution,
+                "parallel_backend": self.cfg.parallel_backend,
+                "render_strips": self.cfg.render_strips,
+                "uncapped_fps": self.cfg.uncapped_fps,
                 "music_volume": float(self.cfg.music_volume),
                 "sfx_volume": float(self.cfg.sfx_volume),
             }
@@ -234,20 +288,61 @@ class App:
         self.state.on_enter(self)
 
     def run(self) -> None:
+        step = 1.0 / C.SIM_HZ
+        acc = 0.0
         while self.running:
-            dt = self.clock.tick(C.FPS) / 1000.0
-            if dt > 0.05:
-                dt = 0.05
-            t = pygame.time.get_ticks() / 1000.0
+            # симуляция идёт фиксированными шагами, кадр рисуется между двумя последними
+            frame_dt = self.clock.tick(0 if self.cfg.uncapped_fps else C.FPS) / 1000.0
+            acc += min(frame_dt, C.SIM_MAX_FRAME_DT)
+            now = pygame.time.get_ticks() / 1000.0
+            work_start = time.perf_counter()
 
             for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+                if event.type in (pygame.QUIT, pygame.WINDOWCLOSE):
                     self.running = False
+                elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                    PERF.toggle()
                 else:
                     self.state.handle_event(self, event)
 
-            self.state.update(self, dt, t)
+            PERF.start("update")
+            steps = 0
+            while acc >= step:
+                acc -= step
+                # t шага на шкале get_ticks: от неё считаются active_time монстров и т.п.
+                t = now - acc
+                if self.recorder is not None:
+                    self.recorder.before_update(self, self.state, step, t)
+                self.state.update(self, step, t)
+                if self.recorder is not None:
+                    self.recorder.after_update()
+                self.sim_tick += 1
+                steps += 1
+                if steps >= C.SIM_MAX_STEPS:
+                    # не догоняем бесконечно: при долгом кадре игра замедляется
+                    acc %= step
+                    break
+            self.render_alpha = acc / step
+            PERF.count("sim_steps", steps)
+            PERF.stop("update")
+
+            PERF.start("draw")
             self.state.draw(self)
-            pygame.display.flip()
+            PERF.stop("draw")
+
+            if PERF.enabled:
+                self.perf_overlay.draw(self.screen, self.presenter, self.clock.get_fps())
+
+            PERF.start("flip")
+            self.presenter.flip(self.screen)
+            PERF.stop("flip")
+
+            # время работы кадра без ожидания в clock.tick
+            frame_ms = (time.perf_counter() - work_start) * 1000.0
+            PERF.end_frame(frame_ms)
+            self.renderer.end_frame()
 
+        if self.recorder is not None:
+            self.recorder.close()
+        self.renderer.close()
         pygame.quit()
@@ -0,0 +1,39 @@
+# atlas.py
+from typing import Dict, List, Optional, Tuple
+
+import pygame
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from mipmap import build_mip_chain, pack_mip_stack
+from tiles import TILE_COUNT, TILE_WALL
+
+
+class TextureAtlas:
+    """
+    Wall materials indexed by tile ID: textures[tile - 1]. Built once per Renderer;
+    the wall pass (blit columns or the packed mip stack), the door plane and the
+    minimap all read from it, so adding a material is one more entry here.
+    """
+
+    def __init__(self, textures: Dict[int, pygame.Surface]) -> None:
+        base = textures[TILE_WALL]
+        # у ID без своей текстуры — обычная стена
+        self.textures: List[pygame.Surface] = [textures.get(t, base) for t in range(1, TILE_COUNT)]
+        self.mips: List[List[pygame.Surface]] = [build_mip_chain(t) for t in self.textures]
+        self.stack: Optional["np.ndarray"] = pack_mip_stack(self.mips) if np is not None else None
+
+        # средний цвет материала, притемнённый, — клетка на мини-карте
+        self.minimap_colors: List[Tuple[int, int, int, int]] = []
+        for chain in self.mips:
+            r, g, b = pygame.transform.average_color(chain[-1])[:3]
+            self.minimap_colors.append((int(r * 0.3), int(g * 0.3), int(b * 0.3), 230))
+
+    def texture(self, tile: int) -> pygame.Surface:
+        return self.textures[tile - 1]
+
+    def minimap_color(self, tile: int) -> Tuple[int, int, int, int]:
+        return self.minimap_colors[tile - 1]
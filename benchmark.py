@@ -0,0 +1,360 @@
+# benchmark.py
+"""
+Headless fly-through benchmark:
+
+    python benchmark.py --frames 300 --json bench.json --csv bench.csv
+
+Every MapSpec in MAP_VARIANTS is loaded with a fixed seed, the player is flown
+along a scripted path and N frames go through the real Renderer.draw_play.
+
+    python benchmark.py --check-mappers
+
+compares the blit and surfarray wall passes pixel by pixel instead.
+"""
+import argparse
+import csv
+import json
+import math
+import os
+import platform
+import random
+import sys
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Headless renderer fly-through benchmark")
+    ap.add_argument("--frames", type=int, default=300, help="measured frames per map")
+    ap.add_argument("--warmup", type=int, default=30, help="unmeasured frames per map (caches, PVS)")
+    ap.add_argument("--seed", type=int, default=1234, help="seed for the generated mazes and the path")
+    ap.add_argument("--size", default="1280x720", help="window size, WxH")
+    ap.add_argument("--maps", default="", help="comma-separated map indices (default: all)")
+    ap.add_argument("--present", default="software", help="software | sdl2")
+    ap.add_argument("--parallel", default="serial", help="serial | threads | processes")
+    ap.add_argument("--strips", type=int, default=4)
+    ap.add_argument("--engine", default="", help="python | numpy (default: renderer default)")
+    ap.add_argument("--mapper", default="", help="blit | surfarray (default: renderer default)")
+    ap.add_argument("--floor", default="", help="off | low | high (default: C.FLOOR_QUALITY)")
+    ap.add_argument("--json", default="", help="write the report as JSON")
+    ap.add_argument("--csv", default="", help="write per map/stage rows as CSV")
+    ap.add_argument(
+        "--check-mappers",
+        action="store_true",
+        help="compare blit and surfarray wall passes on fixed poses (quantization off) instead of timing",
+    )
+    return ap.parse_args(argv)
+
+
+def stats_of(values: List[float]) -> Dict[str, float]:
+    from perf import percentile
+
+    data = sorted(values)
+    return {
+        "mean": sum(data) / len(data) if data else 0.0,
+        "p50": percentile(data, 50),
+        "p95": percentile(data, 95),
+        "p99": percentile(data, 99),
+    }
+
+
+def fly_path(world, start: Tuple[float, float]) -> List[Tuple[float, float]]:
+    """Cell centres from start to the farthest reachable cell, then back."""
+    from pathfinding import DIRS4, compute_dist_map
+
+    sx, sy = int(start[0]), int(start[1])
+    dist = compute_dist_map(world, sx, sy, world.is_blocking_cell)
+    far = max(
+        ((d, x, y) for y, row in enumerate(dist) for x, d in enumerate(row) if d > 0),
+        default=(0, sx, sy),
+    )
+    _, x, y = far
+
+    cells = [(x, y)]
+    while dist[y][x] > 0:
+        for dx, dy in DIRS4:
+            nx, ny = x + dx, y + dy
+            if 0 <= nx < world.w and 0 <= ny < world.h and dist[ny][nx] == dist[y][x] - 1:
+                x, y = nx, ny
+                break
+        cells.append((x, y))
+    cells.reverse()
+
+    path = [(cx + 0.5, cy + 0.5) for cx, cy in cells]
+    return path + path[-2:0:-1] if len(path) > 1 else path
+
+
+def _door_near(world, path: List[Tuple[float, float]]) -> Tuple[Optional[Tuple[float, float]], str]:
+    # дверь на стене рядом с путём, примерно на 60% пути
+    n = len(path) // 2 or 1
+    for i in list(range(int(n * 0.6), n)) + list(range(0, int(n * 0.6))):
+        mx, my = int(path[i][0]), int(path[i][1])
+        for dx, dy, ori in ((-1, 0, "vertical"), (1, 0, "vertical"), (0, -1, "horizontal"), (0, 1, "horizontal")):
+            if world.is_wall_cell(mx + dx, my + dy):
+                if ori == "vertical":
+                    return (float(mx if dx == -1 else mx + 1), my + 0.5), ori
+                return (mx + 0.5, float(my if dy == -1 else my + 1)), ori
+    return None, "vertical"
+
+
+def run_map(app, index: int, spec, args: argparse.Namespace) -> Dict[str, Any]:
+    import pygame
+
+    from entities import Monster, Player
+    from perf import PERF
+    from settings import C
+    from world import World
+
+    world = World(spec)
+    start = app.find_empty_cell(world, (2, 2))
+    path = fly_path(world, start)
+    n = len(path) // 2 or 1
+
+    zachetki = [path[min(len(path) - 1, int(n * f))] for f in (0.25, 0.5, 0.75)]
+    monsters = [Monster(x=path[n - 1][0], y=path[n - 1][1], active_time=0.0)]
+    door_plane, door_ori = _door_near(world, path)
+
+    player = Player(x=path[0][0], y=path[0][1])
+    renderer = app.renderer
+    dt = 1.0 / C.FPS
+    speed = C.MOVE_SPEED
+    seg = 0
+    seg_t = 0.0
+
+    frame_ms: List[float] = []
+    stage_ms: Dict[str, List[float]] = {}
+    counters: Dict[str, List[int]] = {}
+
+    caches = (renderer.column_cache, renderer.sprite_cache)
+    total = args.warmup + args.frames
+    for i in range(total):
+        if i == args.warmup:
+            for cache in caches:
+                cache.reset_stats()
+        # движение по пути с постоянной скоростью + покачивание взгляда
+        if len(path) > 1:
+            seg_t += speed * dt
+            while seg_t >= 1.0:
+                seg_t -= 1.0
+                seg = (seg + 1) % (len(path) - 1)
+            (ax, ay), (bx, by) = path[seg], path[seg + 1]
+            player.x = ax + (bx - ax) * seg_t
+            player.y = ay + (by - ay) * seg_t
+            heading = math.atan2(by - ay, bx - ax)
+        else:
+            heading = 0.0
+        heading += 0.6 * math.sin(i * 0.05)
+        player.dirx, player.diry = math.cos(heading), math.sin(heading)
+        player.planex, player.planey = -player.diry * C.FOV_PLANE, player.dirx * C.FOV_PLANE
+
+        pygame.event.pump()
+        t0 = time.perf_counter()
+        renderer.draw_play(
+            world,
+            player,
+            monsters,
+            True,
+            False,
+            door_pos=None,
+            door_plane_pos=door_plane,
+            door_orientation=door_ori,
+            zachetki=zachetki,
+            zachet_collected=[False] * len(zachetki),
+            lives=3,
+        )
+        PERF.start("flip")
+        app.presenter.flip(app.screen)
+        PERF.stop("flip")
+        ms = (time.perf_counter() - t0) * 1000.0
+        PERF.end_frame(ms)
+
+        if i < args.warmup:
+            continue
+        frame_ms.append(ms)
+        for k, v in PERF.stage_ms.items():
+            stage_ms.setdefault(k, []).append(v)
+        for k, v in PERF.counters.items():
+            counters.setdefault(k, []).append(v)
+
+    return {
+        "index": index,
+        "size": [world.w, world.h],
+        "path_cells": len(path),
+        "frame_ms": stats_of(frame_ms),
+        "stages_ms": {k: stats_of(v) for k, v in stage_ms.items()},
+        "counters_mean": {k: sum(v) / len(v) for k, v in counters.items()},
+        # доли попаданий кэшей за измеряемые кадры
+        "caches": {cache.name: cache.stats() for cache in caches},
+    }
+
+
+def check_mappers(app, index: int, spec, headings: int = 8) -> Dict[str, Any]:
+    """
+    Renders the same poses with the blit and the surfarray wall mapper and
+    compares the low-res frames. Quantization is switched off for the check:
+    with it, shade bands and the column height step make the blit path differ
+    by design (see texmap.map_wall_columns).
+    """
+    import pygame
+    import numpy as np
+
+    from settings import C
+    from entities import Player
+    from world import World
+
+    world = World(spec)
+    start = app.find_empty_cell(world, (2, 2))
+    path = fly_path(world, start)
+    poses = path[: len(path) // 2 + 1 : max(1, len(path) // 16)]
+
+    r = app.renderer
+    saved = (r.wall_mapper, r.floor_quality, r.reuse_frames, r.quantize)
+    r.set_floor_quality("off")
+    r.reuse_frames, r.quantize = False, False
+    r.column_cache.clear()
+
+    player = Player(x=start[0], y=start[1])
+    max_diff = 0
+    diff_px = 0
+    total_px = 0
+    for x, y in poses:
+        player.x, player.y = x, y
+        for k in range(headings):
+            heading = 2.0 * math.pi * k / headings + 0.1
+            player.dirx, player.diry = math.cos(heading), math.sin(heading)
+            player.planex, player.planey = -player.diry * C.FOV_PLANE, player.dirx * C.FOV_PLANE
+            frames = []
+            for mapper in ("blit", "surfarray"):
+                r.set_wall_mapper(mapper)
+                zbuffer = [1e9] * r.render_w
+                r._draw_floor(player)
+                r._cast_walls(world, player, zbuffer)
+                frames.append(pygame.surfarray.array3d(r.render).astype(np.int16))
+            diff = np.abs(frames[0] - frames[1]).max(axis=2)
+            max_diff = max(max_diff, int(diff.max()))
+            diff_px += int(np.count_nonzero(diff))
+            total_px += diff.size
+
+    r.set_wall_mapper(saved[0])
+    r.set_floor_quality(saved[1])
+    r.reuse_frames, r.quantize = saved[2:]
+    r.column_cache.clear()
+    return {
+        "index": index,
+        "poses": len(poses) * headings,
+        "max_diff": max_diff,
+        "diff_share": diff_px / total_px if total_px else 0.0,
+    }
+
+
+def write_csv(path: str, report: Dict[str, Any]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        wr = csv.writer(f)
+        wr.writerow(["map", "w", "h", "stage", "mean_ms", "p50_ms", "p95_ms", "p99_ms"])
+        for m in report["maps"]:
+            rows = [("frame", m["frame_ms"])] + sorted(m["stages_ms"].items())
+            for stage, st in rows:
+                wr.writerow([m["index"], m["size"][0], m["size"][1], stage] + [f"{st[k]:.4f}" for k in ("mean", "p50", "p95", "p99")])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    args = parse_args(argv)
+
+    # MAP_VARIANTS генерируются при импорте world — сид ставим до импорта
+    random.seed(args.seed)
+
+    import pygame
+
+    from app import App
+    from perf import PERF
+    from settings import RuntimeConfig
+    from world import MAP_VARIANTS
+
+    w, h = (int(v) for v in args.size.lower().split("x"))
+    cfg = RuntimeConfig(
+        fullscreen=False,
+        window_size=(w, h),
+        present_backend=args.present,
+        dynamic_resolution=False,
+        parallel_backend=args.parallel,
+        render_strips=args.strips,
+        music_volume=0.0,
+        sfx_volume=0.0,
+    )
+    app = App(cfg)
+    r = app.renderer
+    if args.engine:
+        r.set_wall_engine(args.engine)
+    if args.mapper:
+        r.set_wall_mapper(args.mapper)
+    if args.floor:
+        r.set_floor_quality(args.floor)
+
+    indices = [int(v) for v in args.maps.split(",") if v.strip()] or list(range(len(MAP_VARIANTS)))
+
+    if args.check_mappers:
+        from renderer import WALL_MAPPERS
+
+        if "surfarray" not in WALL_MAPPERS:
+            print("surfarray mapper is not available (numpy missing)")
+            return 2
+        failed = 0
+        for idx in indices:
+            res = check_mappers(app, idx, MAP_VARIANTS[idx])
+            failed += res["max_diff"] > 0
+            print(
+                f"map {idx:2d} poses {res['poses']:3d}  max diff {res['max_diff']:3d}  "
+                f"differing {res['diff_share'] * 100.0:.3f}%"
+            )
+        r.close()
+        pygame.quit()
+        return 1 if failed else 0
+
+    PERF.set_enabled(True)
+    maps = []
+    for idx in indices:
+        random.seed(args.seed + idx)
+        res = run_map(app, idx, MAP_VARIANTS[idx], args)
+        maps.append(res)
+        fm = res["frame_ms"]
+        print(
+            f"map {idx:2d} {res['size'][0]:3d}x{res['size'][1]:<3d} "
+            f"mean {fm['mean']:6.2f}  p50 {fm['p50']:6.2f}  p95 {fm['p95']:6.2f}  p99 {fm['p99']:6.2f} ms"
+        )
+
+    report = {
+        "meta": {
+            "seed": args.seed,
+            "frames": args.frames,
+            "warmup": args.warmup,
+            "window": [w, h],
+            "render": [r.render_w, r.render_h],
+            "present": app.presenter.name,
+            "parallel": r.parallel,
+            "strips": r.strips,
+            "engine": r.wall_engine,
+            "mapper": r.wall_mapper,
+            "floor": r.floor_quality,
+            "python": sys.version.split()[0],
+            "pygame": pygame.version.ver,
+            "platform": platform.platform(),
+        },
+        "maps": maps,
+    }
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    if args.csv:
+        write_csv(args.csv, report)
+
+    r.close()
+    pygame.quit()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
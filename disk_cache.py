@@ -0,0 +1,40 @@
+# disk_cache.py
+import hashlib
+import os
+from typing import Any, Optional
+
+
+def content_key(*parts: Any) -> str:
+    """Stable short hash of the parameters that fully determine a cached blob."""
+    h = hashlib.sha1()
+    for part in parts:
+        h.update(repr(part).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()[:20]
+
+
+def load_bytes(cache_dir: Optional[str], name: str, expected_size: int) -> Optional[bytes]:
+    if not cache_dir:
+        return None
+    path = os.path.join(cache_dir, name)
+    try:
+        if os.path.getsize(path) != expected_size:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def save_bytes(cache_dir: Optional[str], name: str, data: bytes) -> None:
+    if not cache_dir:
+        return
+    path = os.path.join(cache_dir, name)
+    tmp = path + ".tmp"
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        return
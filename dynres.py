@@ -0,0 +1,79 @@
+# dynres.py
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+from settings import C
+
+
+class DynamicResolution:
+    """
+    Picks the internal render size from recent world render times (floor, walls,
+    door, sprites: the stages that scale with the render size) against their share
+    of the C.FPS budget. Present, HUD and flip cost the same at any render size,
+    so they are not fed in. Drops a step as soon as the window average is over
+    budget, raises a step only after a cooldown and with clear headroom
+    (hysteresis, no ping-pong).
+    """
+
+    def __init__(
+        self,
+        base_size: Tuple[int, int] = (C.RENDER_W, C.RENDER_H),
+        min_scale: float = C.DYNRES_MIN_SCALE,
+        max_scale: float = C.DYNRES_MAX_SCALE,
+        step: float = C.DYNRES_SCALE_STEP,
+        window: int = C.DYNRES_WINDOW,
+    ) -> None:
+        self.base_size = base_size
+        self.budget_ms = 1000.0 / C.FPS * C.DYNRES_WORLD_SHARE
+
+        # ступени масштаба от min до max
+        self.scales = []
+        s = min_scale
+        while s < max_scale - 1e-6:
+            self.scales.append(round(s, 4))
+            s += step
+        self.scales.append(max_scale)
+
+        self.level = len(self.scales) - 1
+        self.samples: Deque[float] = deque(maxlen=max(1, window))
+        self.frames_since_change = 0
+
+    def size_for(self, level: int) -> Tuple[int, int]:
+        s = self.scales[level]
+        w = max(2, int(round(self.base_size[0] * s / 2)) * 2)
+        h = max(2, int(round(self.base_size[1] * s / 2)) * 2)
+        return w, h
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return self.size_for(self.level)
+
+    def reset(self) -> None:
+        self.level = len(self.scales) - 1
+        self.samples.clear()
+        self.frames_since_change = 0
+
+    def sample(self, world_ms: float) -> Optional[Tuple[int, int]]:
+        """Feeds one frame's world render time; returns the new render size when it changes."""
+        self.samples.append(world_ms)
+        self.frames_since_change += 1
+        if len(self.samples) < self.samples.maxlen:
+            return None
+
+        avg = sum(self.samples) / len(self.samples)
+        new_level = self.level
+        if avg > self.budget_ms * C.DYNRES_DOWN_AT and self.level > 0:
+            new_level = self.level - 1
+        elif (
+            avg < self.budget_ms * C.DYNRES_UP_AT
+            and self.level < len(self.scales) - 1
+            and self.frames_since_change >= C.DYNRES_UP_COOLDOWN
+        ):
+            new_level = self.level + 1
+
+        if new_level == self.level:
+            return None
+        self.level = new_level
+        self.samples.clear()
+        self.frames_since_change = 0
+        return self.size
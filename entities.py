@@ -26,6 +26,23 @@ class Player:
         self.planey = old_planex * sin_a + self.planey * cos_a
 
 
+def interpolate_player(prev: Player, cur: Player, alpha: float) -> Player:
+    """Pose between two sim steps; the view is rotated by the fraction of the turn angle."""
+    if math.hypot(cur.x - prev.x, cur.y - prev.y) > C.INTERP_SNAP_DIST:
+        return cur
+    turn = math.atan2(prev.dirx * cur.diry - prev.diry * cur.dirx, prev.dirx * cur.dirx + prev.diry * cur.diry)
+    p = Player(
+        x=prev.x + (cur.x - prev.x) * alpha,
+        y=prev.y + (cur.y - prev.y) * alpha,
+        dirx=prev.dirx,
+        diry=prev.diry,
+        planex=prev.planex,
+        planey=prev.planey,
+    )
+    p.rotate(turn * alpha)
+    return p
+
+
 @dataclass
 class Monster:
     x: float = 0.0
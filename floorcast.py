@@ -0,0 +1,120 @@
+# floorcast.py
+from typing import Optional, Tuple
+
+import numpy as np
+
+from settings import C
+from disk_cache import content_key, load_bytes, save_bytes
+
+_FLOOR_TEX_VERSION = 1
+
+FLOOR_QUALITIES: Tuple[str, ...] = ("off", "low", "high")
+
+
+def _carpet_pixels(size: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    img = np.empty((size, size, 3), dtype=np.float64)
+    img[:, :] = (118, 106, 72)
+
+    # ворс: мелкий шум + крупные пятна
+    img += rng.normal(0.0, 7.0, (size, size, 1))
+    coarse = rng.normal(0.0, 9.0, (size // 16 + 1, size // 16 + 1, 1))
+    img += np.repeat(np.repeat(coarse, 16, axis=0), 16, axis=1)[:size, :size]
+
+    n = int(size * size * 0.02)
+    xs = rng.integers(0, size, n)
+    ys = rng.integers(0, size, n)
+    img[ys, xs] *= rng.uniform(0.7, 0.9, (n, 1))
+
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def _ceiling_pixels(size: int, seed: int) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    img = np.empty((size, size, 3), dtype=np.float64)
+    img[:, :] = (208, 198, 128)
+    img += rng.normal(0.0, 4.0, (size, size, 1))
+
+    # плитки 2x2 на клетку + швы
+    tile = max(4, size // 2)
+    grout = max(1, size // 64)
+    idx = np.arange(size)
+    seam = (idx % tile) < grout
+    img[seam, :] = (150, 140, 92)
+    img[:, seam] = (150, 140, 92)
+
+    # редкие подтёки
+    for _ in range(3):
+        cx, cy = rng.integers(0, size, 2)
+        r = rng.uniform(size * 0.05, size * 0.12)
+        yy, xx = np.ogrid[:size, :size]
+        mask = (xx - cx) ** 2 + (yy - cy) ** 2 < r * r
+        img[mask] *= (0.88, 0.84, 0.72)
+
+    return np.clip(img, 0, 255).astype(np.uint8)
+
+
+def make_surface_texture(kind: str, size: int, seed: int, cache_dir: Optional[str] = None) -> np.ndarray:
+    """(size, size, 3) uint8 pixels in surfarray (x, y) layout, cached on disk like the wall texture."""
+    gen = {"carpet": _carpet_pixels, "ceiling": _ceiling_pixels}[kind]
+    name = f"{kind}_" + content_key(kind, _FLOOR_TEX_VERSION, size, seed) + ".rgb"
+    data = load_bytes(cache_dir, name, size * size * 3)
+    if data is None:
+        pixels = gen(size, seed)
+        save_bytes(cache_dir, name, pixels.tobytes())
+    else:
+        pixels = np.frombuffer(data, dtype=np.uint8).reshape(size, size, 3)
+    return np.ascontiguousarray(pixels.transpose(1, 0, 2))
+
+
+class FloorCaster:
+    """
+    Row-batched floor/ceiling casting: one distance per screen row,
+    all (row, column) texels gathered at once. Writes into a surfarray frame.
+    """
+
+    def __init__(self, floor_tex: np.ndarray, ceil_tex: np.ndarray) -> None:
+        self.floor_flat = floor_tex.reshape(-1, 3)
+        self.ceil_flat = ceil_tex.reshape(-1, 3)
+        self.floor_size = floor_tex.shape[:2]
+        self.ceil_size = ceil_tex.shape[:2]
+
+    @staticmethod
+    def _sample(flat: np.ndarray, size: Tuple[int, int], wx: np.ndarray, wy: np.ndarray) -> np.ndarray:
+        tw, th = size
+        tx = ((wx - np.floor(wx)) * tw).astype(np.int64) % tw
+        ty = ((wy - np.floor(wy)) * th).astype(np.int64) % th
+        return flat[tx * th + ty]
+
+    def draw(self, frame: np.ndarray, p, quality: str = "high") -> None:
+        render_w, render_h = frame.shape[:2]
+        half = render_h // 2
+        rows = render_h - half
+
+        # "low": половина разрешения по обеим осям, затем повтор
+        step = 2 if quality == "low" else 1
+        xs = np.arange(0, render_w, step, dtype=np.float64)
+        ys = np.arange(0, rows, step, dtype=np.float64)
+
+        cameraX = 2.0 * xs / render_w - 1.0
+        rayDirX = p.dirx + p.planex * cameraX
+        rayDirY = p.diry + p.planey * cameraX
+
+        # расстояние до пола для строки: (H/2) / (y - H/2), по центру пикселя
+        dist = (render_h * 0.5) / (ys + 0.5)
+        wx = p.x + dist[None, :] * rayDirX[:, None]
+        wy = p.y + dist[None, :] * rayDirY[:, None]
+
+        fog = np.exp(-C.FOG_STRENGTH * dist * 22.0)
+        mul = np.clip((255 * fog).astype(np.int64), 20, 255).astype(np.uint16)[None, :, None]
+
+        floor = ((self._sample(self.floor_flat, self.floor_size, wx, wy).astype(np.uint16) * mul + 255) >> 8).astype(np.uint8)
+        ceil = ((self._sample(self.ceil_flat, self.ceil_size, wx, wy).astype(np.uint16) * mul + 255) >> 8).astype(np.uint8)
+
+        if step > 1:
+            floor = np.repeat(np.repeat(floor, step, axis=0), step, axis=1)[:render_w, :rows]
+            ceil = np.repeat(np.repeat(ceil, step, axis=0), step, axis=1)[:render_w, :rows]
+
+        frame[:, half:] = floor
+        # потолок — зеркально относительно горизонта
+        frame[:, half - 1::-1] = ceil[:, :half]
@@ -0,0 +1,100 @@
+# fonts.py
+import os
+from typing import Dict, List, Tuple
+
+import pygame
+
+from settings import resource_path
+from surface_cache import SurfaceCache
+
+Color = Tuple[int, int, int]
+OutlineLayers = List[Tuple[Color, int]]
+
+# шрифты из папки fonts/ (попадают в сборку PyInstaller)
+FONT_FILES: Dict[Tuple[str, bool], str] = {
+    ("mono", False): "fonts/DejaVuSansMono.ttf",
+    ("mono", True): "fonts/DejaVuSansMono-Bold.ttf",
+}
+
+# системный шрифт, если файла нет
+SYSFONT_FALLBACK: Dict[str, str] = {
+    "mono": "consolas",
+}
+
+
+class FontRegistry:
+    """Resolves each (family, size, bold) once; SysFont is only hit if the bundled TTF is missing."""
+
+    def __init__(self) -> None:
+        self._fonts: Dict[Tuple[str, int, bool], pygame.font.Font] = {}
+
+    def get(self, size: int, bold: bool = False, family: str = "mono") -> pygame.font.Font:
+        key = (family, size, bold)
+        font = self._fonts.get(key)
+        if font is not None:
+            return font
+
+        font = None
+        fname = FONT_FILES.get((family, bold))
+        if fname is not None:
+            path = resource_path(fname)
+            if os.path.exists(path):
+                try:
+                    font = pygame.font.Font(path, size)
+                except Exception:
+                    font = None
+        if font is None:
+            font = pygame.font.SysFont(SYSFONT_FALLBACK.get(family, family), size, bold=bold)
+
+        self._fonts[key] = font
+        return font
+
+
+def text_with_outlines(
+    text: str,
+    font: pygame.font.Font,
+    inner_color: Color,
+    outline_layers: OutlineLayers,
+) -> pygame.Surface:
+    base = font.render(text, True, inner_color)
+    pad = max((r for _, r in outline_layers), default=0)
+    surf = pygame.Surface((base.get_width() + pad * 2, base.get_height() + pad * 2), pygame.SRCALPHA)
+
+    for color, rad in outline_layers:
+        outline = font.render(text, True, color)
+        offsets = [
+            (-rad, 0),
+            (rad, 0),
+            (0, -rad),
+            (0, rad),
+            (-rad, -rad),
+            (-rad, rad),
+            (rad, -rad),
+            (rad, rad),
+        ]
+        for dx, dy in offsets:
+            surf.blit(outline, (pad + dx, pad + dy))
+
+    surf.blit(base, (pad, pad))
+    return surf
+
+
+class TextCache:
+    """Rendered text surfaces keyed by (font, text, color, outline layers)."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.cache = SurfaceCache(max_bytes)
+
+    def render(self, font: pygame.font.Font, text: str, color: Color) -> pygame.Surface:
+        key = (id(font), text, color, ())
+        surf = self.cache.get(key)
+        if surf is None:
+            surf = self.cache.put(key, font.render(text, True, color))
+        return surf
+
+    def outlined(self, font: pygame.font.Font, text: str, inner_color: Color, outline_layers: OutlineLayers) -> pygame.Surface:
+        key = (id(font), text, inner_color, tuple(outline_layers))
+        surf = self.cache.get(key)
+        if surf is None:
+            surf = self.cache.put(key, text_with_outlines(text, font, inner_color, outline_layers))
+        return surf
@@ -0,0 +1,101 @@
+# grain.py
+import random
+from typing import List, Optional, Tuple, Union
+
+import pygame
+
+from settings import C
+
+
+class GrainRing:
+    """
+    Film grain from a small ring of pre-generated noise tiles. Each frame covers
+    the screen with tiles picked at random from the ring, shifted by a random
+    offset, in one blits() call, so the cost does not depend on density and the
+    memory does not depend on resolution.
+    """
+
+    def __init__(
+        self,
+        dots: Union[int, Tuple[int, int]],
+        intensity: Tuple[int, int],
+        frames: int = C.GRAIN_FRAMES,
+        tile: int = C.GRAIN_TILE,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.dots = (dots, dots) if isinstance(dots, int) else dots
+        self.intensity = intensity
+        self.frame_count = max(2, frames)
+        self.tile = max(16, tile)
+        # свой генератор: зерно не сдвигает глобальный random (карты, реплеи)
+        self.rng = random.Random(seed)
+
+        self._tiles: List[pygame.Surface] = []
+        self._points: List[List[Tuple[int, int, int]]] = []
+        self._tile_size: Tuple[int, int] = (0, 0)
+        self._size: Optional[Tuple[int, int]] = None
+
+    def configure(self, dots: Union[int, Tuple[int, int], None] = None, intensity: Optional[Tuple[int, int]] = None) -> None:
+        if dots is not None:
+            self.dots = (dots, dots) if isinstance(dots, int) else dots
+        if intensity is not None:
+            self.intensity = intensity
+        self._size = None
+
+    def _build(self, size: Tuple[int, int]) -> None:
+        w, h = max(1, size[0]), max(1, size[1])
+        tw, th = min(self.tile, w), min(self.tile, h)
+        lo, hi = self.intensity
+        rng = self.rng
+        # плотность задана на весь экран — переводим в точки на тайл
+        share = (tw * th) / float(w * h)
+
+        self._tiles = []
+        self._points = []
+        for _ in range(self.frame_count):
+            surf = pygame.Surface((tw, th))
+            surf.fill((0, 0, 0))
+            n = rng.randint(self.dots[0], self.dots[1]) * share
+            count = int(n) + (1 if rng.random() < n - int(n) else 0)
+            points = []
+            surf.lock()
+            for _ in range(count):
+                c = rng.randint(max(1, lo), hi)
+                x, y = rng.randrange(tw), rng.randrange(th)
+                surf.set_at((x, y), (c, c, c))
+                points.append((x, y, c))
+            surf.unlock()
+            surf.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            self._tiles.append(surf)
+            self._points.append(points)
+        self._tile_size = (tw, th)
+        self._size = size
+
+    def _layout(self, size: Tuple[int, int]) -> List[Tuple[int, int, int]]:
+        """(tile index, x, y) covering the screen for one frame."""
+        if size != self._size:
+            self._build(size)
+        w, h = size
+        tw, th = self._tile_size
+        rng = self.rng
+        n = self.frame_count
+        # случайный сдвиг сетки и случайный тайл в каждой ячейке — повтор не виден
+        ox, oy = rng.randrange(tw), rng.randrange(th)
+        return [(rng.randrange(n), x, y) for y in range(-oy, h, th) for x in range(-ox, w, tw)]
+
+    def draw(self, screen: pygame.Surface) -> None:
+        layout = self._layout(screen.get_size())
+        tiles = self._tiles
+        screen.blits([(tiles[i], (x, y)) for i, x, y in layout], doreturn=False)
+
+    def next_points(self, size: Tuple[int, int]) -> List[Tuple[int, int, int]]:
+        """Same grain, as (x, y, intensity) dots for backends that draw points themselves."""
+        w, h = size
+        out = []
+        for i, ox, oy in self._layout(size):
+            for x, y, c in self._points[i]:
+                x += ox
+                y += oy
+                if 0 <= x < w and 0 <= y < h:
+                    out.append((x, y, c))
+        return out
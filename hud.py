@@ -0,0 +1,99 @@
+# hud.py
+from typing import List, Optional, Sequence, Tuple
+
+import pygame
+
+Layer = Tuple[pygame.Surface, Tuple[int, int]]
+
+
+def _compose(items: Sequence[Layer]) -> Optional[Layer]:
+    """Bakes items into one transparent layer over their bounding box."""
+    if not items:
+        return None
+    if len(items) == 1:
+        return items[0]
+
+    bounds = pygame.Rect(items[0][1], items[0][0].get_size())
+    for surf, pos in items[1:]:
+        bounds.union_ip(pygame.Rect(pos, surf.get_size()))
+
+    # элементы не перекрываются: BLEND_RGBA_MAX по прозрачному слою копирует
+    # их RGBA как есть; обычный альфа-блит затемнил бы края сглаженного текста
+    layer = pygame.Surface(bounds.size, pygame.SRCALPHA)
+    layer.fill((0, 0, 0, 0))
+    for surf, (x, y) in items:
+        layer.blit(surf, (x - bounds.x, y - bounds.y), special_flags=pygame.BLEND_RGBA_MAX)
+    return layer, bounds.topleft
+
+
+class HudLayer:
+    """
+    Pre-rendered HUD: the corner group (hearts, zachetki, counter) and the door
+    hint are separate layers, so neither is padded out to a box spanning the
+    screen. Each is rebuilt only when what it shows changes; every frame is one
+    blit per layer.
+    """
+
+    def __init__(self, heart_img: pygame.Surface, zachet_img: pygame.Surface) -> None:
+        self.heart = pygame.transform.smoothscale(heart_img, (28, 28))
+
+        icon = pygame.transform.smoothscale(zachet_img, (34, 34))
+        self.icon_got = icon
+        self.icon_missing = icon.copy()
+        self.icon_missing.fill((110, 110, 110, 255), special_flags=pygame.BLEND_MULT)
+
+        self.layers: List[Layer] = []
+        self.rebuilds = 0
+        self._corner: Optional[Layer] = None
+        self._hint: Optional[Layer] = None
+        self._corner_key: Optional[tuple] = None
+        self._hint_key: Optional[tuple] = None
+
+    def invalidate(self) -> None:
+        self._corner_key = None
+        self._hint_key = None
+
+    def update(
+        self,
+        screen_size: Tuple[int, int],
+        font: pygame.font.Font,
+        lives: int,
+        zachet_collected: Sequence[bool],
+        hint: str = "",
+    ) -> None:
+        corner_key = (id(font), lives, tuple(zachet_collected))
+        hint_key = (screen_size, id(font), hint)
+        if corner_key == self._corner_key and hint_key == self._hint_key:
+            return
+
+        if corner_key != self._corner_key:
+            self._corner_key = corner_key
+            self.rebuilds += 1
+            self._corner = self._build_corner(font, lives, zachet_collected)
+
+        if hint_key != self._hint_key:
+            self._hint_key = hint_key
+            self.rebuilds += 1
+            self._hint = None
+            if hint:
+                w, h = screen_size
+                txt = font.render(hint, True, (235, 235, 235))
+                self._hint = (txt, (w // 2 - txt.get_width() // 2, int(h * 0.82)))
+
+        self.layers = [layer for layer in (self._corner, self._hint) if layer is not None]
+
+    def _build_corner(self, font: pygame.font.Font, lives: int, zachet_collected: Sequence[bool]) -> Optional[Layer]:
+        items: List[Layer] = []
+
+        for i in range(max(0, lives)):
+            items.append((self.heart, (12 + i * 32, 12)))
+
+        total = len(zachet_collected)
+        got = sum(1 for c in zachet_collected if c)
+        for i in range(total):
+            icon = self.icon_got if zachet_collected[i] else self.icon_missing
+            items.append((icon, (12 + i * 40, 50)))
+        if total:
+            items.append((font.render(f"{got}/{total}", True, (230, 230, 230)), (12, 90)))
+
+        return _compose(items)
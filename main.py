@@ -1,5 +1,18 @@
 # main.py
+import argparse
+import multiprocessing
+
 from app import App
 
 if __name__ == "__main__":
-    App().run()
+    # воркеры "processes" запускаются через spawn (и в сборке PyInstaller)
+    multiprocessing.freeze_support()
+
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--record", default="", help="record PlayState input to a replay file")
+    args, _ = ap.parse_known_args()
+
+    app = App()
+    if args.record:
+        app.start_recording(args.record)
+    app.run()
@@ -0,0 +1,60 @@
+# mipmap.py
+import math
+from typing import List, Sequence, Tuple
+
+import pygame
+
+from settings import C
+
+
+def build_mip_chain(tex: pygame.Surface, min_size: int = C.MIP_MIN_SIZE) -> List[pygame.Surface]:
+    """tex plus its area-filtered halvings down to min_size (level k is 2**k times smaller)."""
+    chain = [tex]
+    w, h = tex.get_size()
+    while min(w, h) // 2 >= min_size:
+        w, h = max(1, w // 2), max(1, h // 2)
+        try:
+            chain.append(pygame.transform.smoothscale(chain[-1], (w, h)))
+        except ValueError:  # smoothscale умеет только 24/32 бит — остаёмся без мипов
+            break
+    return chain
+
+
+def mip_level(tex_h: int, screen_h: int, levels: int) -> int:
+    """Largest level that still has at least one texel per screen pixel."""
+    if screen_h <= 0:
+        return levels - 1
+    ratio = tex_h / screen_h
+    if ratio < 2.0:
+        return 0
+    return min(levels - 1, int(math.log2(ratio)))
+
+
+def mip_rows(tex_h: int, min_size: int = C.MIP_MIN_SIZE) -> List[Tuple[int, int]]:
+    """(y offset, height) of every level in a packed mip column, see pack_mip_stack."""
+    rows = []
+    off, h = 0, tex_h
+    while True:
+        rows.append((off, h))
+        if h // 2 < min_size:
+            return rows
+        off += h
+        h //= 2
+
+
+def pack_mip_stack(chains: Sequence[List[pygame.Surface]]):
+    """
+    (n, tw, 2 * th, 3) uint8 array for texmap: level k of texture column x sits at
+    [x * w_k // tw, off_k : off_k + h_k]. All levels live in one array, so it can be
+    shared between strip workers like the plain texture stack.
+    """
+    import numpy as np
+
+    tw, th = chains[0][0].get_size()
+    rows = mip_rows(th)
+    stack = np.zeros((len(chains), tw, 2 * th, 3), dtype=np.uint8)
+    for i, chain in enumerate(chains):
+        for (off, h), level in zip(rows, chain):
+            arr = pygame.surfarray.array3d(level)
+            stack[i, : arr.shape[0], off : off + h] = arr[:, :h]
+    return stack
@@ -0,0 +1,264 @@
+# parallel.py
+import itertools
+import multiprocessing
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from portals import PortalEdges
+from raycast import cast_walls_numpy, grid_tiles
+from texmap import map_wall_columns
+
+# "serial" = обычный проход Renderer, без пула
+PARALLEL_BACKENDS: Tuple[str, ...] = ("serial", "threads", "processes")
+
+
+def strip_bounds(render_w: int, strips: int) -> List[Tuple[int, int]]:
+    strips = max(1, min(strips, render_w))
+    edges = [render_w * i // strips for i in range(strips + 1)]
+    return [(edges[i], edges[i + 1]) for i in range(strips)]
+
+
+def render_strip(world, pose, render_w: int, tex_w: int, x0: int, x1: int, frame: np.ndarray, zbuf: np.ndarray, tex_stack: np.ndarray) -> float:
+    """Casts and textures columns [x0, x1) into frame / zbuf. Returns the strip time in ms."""
+    t0 = time.perf_counter()
+    perp, side, tex_x, tile = cast_walls_numpy(world, pose, render_w, tex_w, x0, x1)
+    map_wall_columns(frame, tex_stack, perp, side, tex_x, tile, x0=x0)
+    zbuf[x0:x1] = perp
+    return (time.perf_counter() - t0) * 1000.0
+
+
+class ThreadStripBackend:
+    """Strips on a thread pool; scales as far as numpy releases the GIL."""
+
+    name = "threads"
+
+    def __init__(self, strips: int) -> None:
+        self.strips = max(1, strips)
+        self.pool = ThreadPoolExecutor(max_workers=self.strips, thread_name_prefix="strip")
+
+    def render(self, world, pose, frame: np.ndarray, zbuf: np.ndarray, tex_stack: np.ndarray, tex_w: int) -> List[float]:
+        render_w = frame.shape[0]
+        jobs = [
+            self.pool.submit(render_strip, world, pose, render_w, tex_w, x0, x1, frame, zbuf, tex_stack)
+            for x0, x1 in strip_bounds(render_w, self.strips)
+        ]
+        return [j.result() for j in jobs]
+
+    def close(self) -> None:
+        self.pool.shutdown(wait=True)
+
+
+# ------------------------------------------------------------
+# Worker processes + shared memory
+# ------------------------------------------------------------
+
+class _Pose:
+    __slots__ = ("x", "y", "dirx", "diry", "planex", "planey")
+
+    def __init__(self, x: float, y: float, dirx: float, diry: float, planex: float, planey: float) -> None:
+        self.x, self.y = x, y
+        self.dirx, self.diry = dirx, diry
+        self.planex, self.planey = planex, planey
+
+
+class _StripWorld:
+    """Stand-in for World in a worker: only what the wall caster reads."""
+
+    def __init__(self, w: int, h: int, wrap_portals: list, tiles: bytes) -> None:
+        self.w, self.h = w, h
+        self.wrap_portals = wrap_portals
+        self.portals = PortalEdges(wrap_portals, w, h)
+        self.tiles = tiles
+
+
+_PORTAL_DIRS = "NSEW"
+
+
+def _pack_world(world) -> bytes:
+    """Tiles (w * h bytes, padded to 8) followed by the wrap portals as float64 (dir, a, b) triples."""
+    tiles = np.ascontiguousarray(grid_tiles(world)).tobytes()
+    pad = -len(tiles) % 8
+    portals = np.array(
+        [(_PORTAL_DIRS.index(d), a, b) for d, a, b in world.wrap_portals if d in _PORTAL_DIRS],
+        dtype=np.float64,
+    ).reshape(-1, 3)
+    return tiles + bytes(pad) + portals.tobytes()
+
+
+def _unpack_world(buf, w: int, h: int, n_portals: int) -> _StripWorld:
+    n = w * h
+    tiles = bytes(buf[:n])
+    off = n + (-n % 8)
+    portals = np.ndarray((n_portals, 3), dtype=np.float64, buffer=buf, offset=off)
+    wrap = [(_PORTAL_DIRS[int(d)], float(a), float(b)) for d, a, b in portals.tolist()]
+    return _StripWorld(w, h, wrap, tiles)
+
+
+# состояние процесса-воркера
+_w_shm: Dict[str, shared_memory.SharedMemory] = {}
+_w_worlds: Dict[Any, _StripWorld] = {}
+_w_tex: Optional[np.ndarray] = None
+_w_tex_name = ""
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    shm = _w_shm.get(name)
+    if shm is None:
+        shm = shared_memory.SharedMemory(name=name)
+        _w_shm[name] = shm
+    return shm
+
+
+def _worker_init(tex_name: str, tex_shape: Tuple[int, ...]) -> None:
+    global _w_tex, _w_tex_name
+    _w_tex_name = tex_name
+    _w_tex = np.ndarray(tex_shape, dtype=np.uint8, buffer=_attach(tex_name).buf)
+
+
+def _worker_strip(task: tuple) -> float:
+    frame_name, frame_shape, zbuf_name, world_key, world_ref, pose, tex_w, x0, x1 = task
+    world = _w_worlds.get(world_key)
+    if world is None:
+        # новый World: один раз читаем клетки и порталы из его общей памяти
+        _w_worlds.clear()
+        name, w, h, n_portals = world_ref
+        shm = shared_memory.SharedMemory(name=name)
+        try:
+            world = _unpack_world(shm.buf, w, h, n_portals)
+        finally:
+            shm.close()
+        _w_worlds[world_key] = world
+    if frame_name not in _w_shm:
+        # буферы сменились (новый размер кадра) — отпускаем старые
+        for name in [n for n in _w_shm if n != _w_tex_name]:
+            _w_shm.pop(name).close()
+    frame = np.ndarray(frame_shape, dtype=np.uint8, buffer=_attach(frame_name).buf)
+    zbuf = np.ndarray((frame_shape[0],), dtype=np.float64, buffer=_attach(zbuf_name).buf)
+    return render_strip(world, _Pose(*pose), frame_shape[0], tex_w, x0, x1, frame, zbuf, _w_tex)
+
+
+class ProcessStripBackend:
+    """
+    Strips on worker processes. Frame and zbuffer live in shared memory;
+    the texture stack is shared once at pool start, the map once per World.
+    A task only carries the World key and the name of its block, workers
+    unpack the map the first time they see the key.
+    """
+
+    name = "processes"
+
+    def __init__(self, strips: int, tex_stack: np.ndarray) -> None:
+        self.strips = max(1, strips)
+        self._tex_shm = self._share(tex_stack)
+        self._frame_shm: Optional[shared_memory.SharedMemory] = None
+        self._zbuf_shm: Optional[shared_memory.SharedMemory] = None
+        self._frame_shape: Optional[Tuple[int, ...]] = None
+        self._frame: Optional[np.ndarray] = None
+        self._zbuf: Optional[np.ndarray] = None
+        # id(world) может повториться, поэтому у каждого World свой номер
+        self._world_keys: "weakref.WeakKeyDictionary[Any, int]" = weakref.WeakKeyDictionary()
+        self._serial = itertools.count(1)
+        self._world_key = 0
+        self._world_shm: Optional[shared_memory.SharedMemory] = None
+        self._world_ref: Optional[Tuple[str, int, int, int]] = None
+
+        ctx = multiprocessing.get_context("spawn")
+        self.pool = ctx.Pool(
+            processes=self.strips,
+            initializer=_worker_init,
+            initargs=(self._tex_shm.name, tex_stack.shape),
+        )
+
+    @staticmethod
+    def _share(arr: np.ndarray) -> shared_memory.SharedMemory:
+        shm = shared_memory.SharedMemory(create=True, size=max(1, arr.nbytes))
+        np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+        return shm
+
+    def _ensure_buffers(self, shape: Tuple[int, ...]) -> None:
+        if shape == self._frame_shape:
+            return
+        self._release_buffers()
+        self._frame_shm = shared_memory.SharedMemory(create=True, size=int(np.prod(shape)))
+        self._zbuf_shm = shared_memory.SharedMemory(create=True, size=shape[0] * 8)
+        self._frame = np.ndarray(shape, dtype=np.uint8, buffer=self._frame_shm.buf)
+        self._zbuf = np.ndarray((shape[0],), dtype=np.float64, buffer=self._zbuf_shm.buf)
+        self._frame_shape = shape
+
+    def _release_buffers(self) -> None:
+        self._frame = None
+        self._zbuf = None
+        for shm in (self._frame_shm, self._zbuf_shm):
+            if shm is not None:
+                shm.close()
+                shm.unlink()
+        self._frame_shm = None
+        self._zbuf_shm = None
+        self._frame_shape = None
+
+    def _ensure_world(self, world) -> int:
+        world_key = self._world_keys.get(world)
+        if world_key is None:
+            world_key = next(self._serial)
+            self._world_keys[world] = world_key
+        if world_key != self._world_key:
+            # воркеры держат только один World, так что и блок нужен только один
+            self._release_world()
+            packed = _pack_world(world)
+            self._world_shm = shared_memory.SharedMemory(create=True, size=max(1, len(packed)))
+            self._world_shm.buf[: len(packed)] = packed
+            n_portals = sum(1 for d, _, _ in world.wrap_portals if d in _PORTAL_DIRS)
+            self._world_ref = (self._world_shm.name, world.w, world.h, n_portals)
+            self._world_key = world_key
+        return world_key
+
+    def _release_world(self) -> None:
+        if self._world_shm is not None:
+            self._world_shm.close()
+            self._world_shm.unlink()
+        self._world_shm = None
+        self._world_ref = None
+        self._world_key = 0
+
+    def render(self, world, pose, frame: np.ndarray, zbuf: np.ndarray, tex_stack: np.ndarray, tex_w: int) -> List[float]:
+        self._ensure_buffers(frame.shape)
+        # пол уже нарисован в frame: переносим в общий буфер и обратно
+        self._frame[...] = frame
+
+        world_key = self._ensure_world(world)
+        pose_t = (pose.x, pose.y, pose.dirx, pose.diry, pose.planex, pose.planey)
+
+        tasks = [
+            (self._frame_shm.name, frame.shape, self._zbuf_shm.name, world_key, self._world_ref, pose_t, tex_w, x0, x1)
+            for x0, x1 in strip_bounds(frame.shape[0], self.strips)
+        ]
+        times = self.pool.map(_worker_strip, tasks)
+
+        frame[...] = self._frame
+        zbuf[...] = self._zbuf
+        return times
+
+    def close(self) -> None:
+        self.pool.terminate()
+        self.pool.join()
+        self._release_buffers()
+        self._release_world()
+        self._tex_shm.close()
+        self._tex_shm.unlink()
+
+
+def create_strip_backend(name: str, strips: int, tex_stack: np.ndarray) -> Optional[Any]:
+    if name == "threads":
+        return ThreadStripBackend(strips)
+    if name == "processes":
+        try:
+            return ProcessStripBackend(strips, tex_stack)
+        except Exception as e:
+            print(f"Warning: process strip backend unavailable ({e}). Using threads.")
+            return ThreadStripBackend(strips)
+    return None
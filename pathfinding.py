@@ -2,6 +2,8 @@
 from collections import deque
 from typing import Any, List, Optional, Tuple
 
+from tiles import FLAG_BLOCKING, FLAG_WALL
+
 DIRS4 = [(1, 0), (-1, 0), (0, 1), (0, -1)]
 
 
@@ -14,6 +16,13 @@ def compute_dist_map(
     if is_blocking is None:
         is_blocking = world.is_wall_cell
 
+    # стандартные предикаты World — BFS прямо по плоской маске клеток
+    if hasattr(world, "mask"):
+        if is_blocking == world.is_wall_cell:
+            return _dist_map_flat(world.w, world.h, world.mask(FLAG_WALL), px, py)
+        if is_blocking == world.is_blocking_cell:
+            return _dist_map_flat(world.w, world.h, world.mask(FLAG_BLOCKING), px, py)
+
     dist = [[-1] * world.w for _ in range(world.h)]
     q = deque()
     dist[py][px] = 0
@@ -30,6 +39,40 @@ def compute_dist_map(
     return dist
 
 
+def _dist_map_flat(w: int, h: int, blocked: bytes, px: int, py: int) -> List[List[int]]:
+    n = w * h
+    dist = [-1] * n
+    start = py * w + px
+    dist[start] = 0
+    q = deque([start])
+
+    while q:
+        i = q.popleft()
+        d = dist[i] + 1
+        x = i % w
+        # соседи в порядке DIRS4
+        if x + 1 < w:
+            j = i + 1
+            if dist[j] == -1 and not blocked[j]:
+                dist[j] = d
+                q.append(j)
+        if x > 0:
+            j = i - 1
+            if dist[j] == -1 and not blocked[j]:
+                dist[j] = d
+                q.append(j)
+        j = i + w
+        if j < n and dist[j] == -1 and not blocked[j]:
+            dist[j] = d
+            q.append(j)
+        j = i - w
+        if j >= 0 and dist[j] == -1 and not blocked[j]:
+            dist[j] = d
+            q.append(j)
+
+    return [dist[y * w:(y + 1) * w] for y in range(h)]
+
+
 def pick_next_cell_for_monster(dist: List[List[int]], mx: int, my: int) -> Optional[Tuple[int, int]]:
     best = None
     best_d = 10**9
@@ -0,0 +1,173 @@
+# perf.py
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Sequence, Tuple
+
+import pygame
+
+
+def percentile(data_sorted: Sequence[float], p: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not data_sorted:
+        return 0.0
+    n = len(data_sorted)
+    return data_sorted[min(n - 1, int(round(p / 100.0 * (n - 1))))]
+
+
+class PerfStats:
+    """
+    Per-frame stage timers and counters plus a rolling window of frame times.
+    Every call returns immediately while disabled, so hooks can stay in hot code.
+    """
+
+    def __init__(self, window: int = 240) -> None:
+        self.enabled = False
+        self.frame_ms: Deque[float] = deque(maxlen=window)
+
+        # текущий кадр
+        self._stages: Dict[str, float] = {}
+        self._counters: Dict[str, int] = {}
+        self._starts: Dict[str, float] = {}
+
+        # последний завершённый кадр
+        self.stage_ms: Dict[str, float] = {}
+        self.counters: Dict[str, int] = {}
+        # сумма счётчиков с момента включения (для долей попаданий кэшей)
+        self.totals: Dict[str, int] = {}
+        # текущие режимы (движок стен и т.п.): пишутся всегда, reset их не трогает
+        self.labels: Dict[str, str] = {}
+
+    def set_enabled(self, enabled: bool) -> None:
+        self.enabled = enabled
+        self.reset()
+
+    def toggle(self) -> bool:
+        self.set_enabled(not self.enabled)
+        return self.enabled
+
+    def reset(self) -> None:
+        self.frame_ms.clear()
+        self._stages = {}
+        self._counters = {}
+        self._starts = {}
+        self.stage_ms = {}
+        self.counters = {}
+        self.totals = {}
+
+    def start(self, stage: str) -> None:
+        if not self.enabled:
+            return
+        self._starts[stage] = time.perf_counter()
+
+    def stop(self, stage: str) -> None:
+        if not self.enabled:
+            return
+        t0 = self._starts.pop(stage, None)
+        if t0 is not None:
+            self._stages[stage] = self._stages.get(stage, 0.0) + (time.perf_counter() - t0) * 1000.0
+
+    def add(self, stage: str, ms: float) -> None:
+        """Adds a time measured elsewhere (e.g. in a worker) to the current frame."""
+        if not self.enabled:
+            return
+        self._stages[stage] = self._stages.get(stage, 0.0) + ms
+
+    def count(self, name: str, n: int = 1) -> None:
+        if not self.enabled:
+            return
+        self._counters[name] = self._counters.get(name, 0) + n
+
+    def label(self, name: str, value: str) -> None:
+        self.labels[name] = value
+
+    def end_frame(self, frame_ms: float) -> None:
+        if not self.enabled:
+            return
+        self.frame_ms.append(frame_ms)
+        self.stage_ms = self._stages
+        self.counters = self._counters
+        for k, v in self._counters.items():
+            self.totals[k] = self.totals.get(k, 0) + v
+        self._stages = {}
+        self._counters = {}
+        self._starts = {}
+
+    def percentiles(self, ps: Sequence[float] = (50, 95, 99)) -> Dict[float, float]:
+        data = sorted(self.frame_ms)
+        return {p: percentile(data, p) for p in ps}
+
+    def hit_rate(self, name: str) -> Optional[float]:
+        """Share of <name>_hit among <name>_hit + <name>_miss over all frames since enabling."""
+        hits = self.totals.get(name + "_hit", 0)
+        total = hits + self.totals.get(name + "_miss", 0)
+        return hits / total if total else None
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "frames": len(self.frame_ms),
+            "frame_ms": self.percentiles(),
+            "stages_ms": dict(self.stage_ms),
+            "counters": dict(self.counters),
+            "totals": dict(self.totals),
+            "labels": dict(self.labels),
+        }
+
+
+PERF = PerfStats()
+
+
+class PerfOverlay:
+    """F3 panel with the PERF numbers; the text is re-rendered a few times per second, not every frame."""
+
+    STAGE_ORDER: Tuple[str, ...] = (
+        "update", "dist_map", "monsters",
+        "draw", "floor", "walls", "door", "sprites", "present", "hud", "minimap",
+        "flip",
+    )
+    HIT_RATES: Tuple[str, ...] = ("wall_reuse", "ray_setup", "column_cache", "sprite_cache")
+
+    def __init__(self, font: pygame.font.Font, stats: PerfStats = PERF, interval: float = 0.25) -> None:
+        self.font = font
+        self.stats = stats
+        self.interval = interval
+        self.surface: Optional[pygame.Surface] = None
+        self._next = 0.0
+
+    def _lines(self, fps: float) -> List[str]:
+        st = self.stats
+        pc = st.percentiles()
+        lines = [
+            f"FPS {fps:5.1f}   frame p50 {pc[50]:5.2f}  p95 {pc[95]:5.2f}  p99 {pc[99]:5.2f} ms",
+        ]
+        if st.labels:
+            lines.append("  ".join(f"{k} {v}" for k, v in st.labels.items()))
+        for name in self.STAGE_ORDER:
+            if name in st.stage_ms:
+                lines.append(f"{name:<9}{st.stage_ms[name]:7.2f} ms")
+        for name, v in st.stage_ms.items():
+            if name not in self.STAGE_ORDER:
+                lines.append(f"{name:<9}{v:7.2f} ms")
+        for name, v in sorted(st.counters.items()):
+            lines.append(f"{name:<14}{v:7d}")
+        for name in self.HIT_RATES:
+            rate = st.hit_rate(name)
+            if rate is not None:
+                lines.append(f"{name + ' hits':<14}{rate * 100.0:6.1f}%")
+        return lines
+
+    def draw(self, screen: pygame.Surface, presenter, fps: float) -> None:
+        now = time.perf_counter()
+        if self.surface is None or now >= self._next:
+            self._next = now + self.interval
+            rows = [self.font.render(line, True, (230, 230, 230)) for line in self._lines(fps)]
+            lh = self.font.get_linesize()
+            w = max(r.get_width() for r in rows) + 16
+            h = lh * len(rows) + 12
+            panel = pygame.Surface((w, h), pygame.SRCALPHA)
+            panel.fill((0, 0, 0, 170))
+            for i, r in enumerate(rows):
+                panel.blit(r, (8, 6 + i * lh))
+            self.surface = panel
+
+        sh = screen.get_height()
+        presenter.overlay(screen, self.surface, (12, sh - self.surface.get_height() - 12))
@@ -0,0 +1,78 @@
+# portals.py
+from bisect import bisect_right
+from typing import Any, Dict, List, Sequence, Tuple
+
+# клетка края: портала нет / вся клетка — портал / граница портала внутри клетки
+EDGE_NONE = 0
+EDGE_FULL = 1
+EDGE_PARTIAL = 2
+
+
+class PortalEdges:
+    """
+    Wrap portals of a World as lookup tables, built once.
+
+    For every edge (N/S by x, E/W by y) the portal intervals are merged and
+    sorted, and each cell along the edge is marked none / full / partial, so a
+    check is one index for most coordinates and a bisect only on a portal border.
+    Intervals are inclusive, like the (direction, a, b) tuples of MapSpec.
+    """
+
+    def __init__(self, wrap_portals: Sequence[Tuple[str, float, float]], w: int, h: int) -> None:
+        self.edges: Dict[str, Tuple[bytearray, List[float], List[float]]] = {}
+        self._arrays: Dict[str, Any] = {}
+
+        by_dir: Dict[str, List[Tuple[float, float]]] = {}
+        for d, a, b in wrap_portals:
+            if a <= b:
+                by_dir.setdefault(d, []).append((float(a), float(b)))
+
+        for d, spans in by_dir.items():
+            spans.sort()
+            starts: List[float] = []
+            ends: List[float] = []
+            for a, b in spans:
+                if ends and a <= ends[-1]:
+                    ends[-1] = max(ends[-1], b)
+                else:
+                    starts.append(a)
+                    ends.append(b)
+
+            size = w if d in ("N", "S") else h
+            cells = bytearray(size)
+            for a, b in zip(starts, ends):
+                for c in range(max(0, int(a) - 1), min(size, int(b) + 2)):
+                    if a <= c and b >= c + 1:
+                        cells[c] = EDGE_FULL
+                    elif a < c + 1 and b >= c and cells[c] != EDGE_FULL:
+                        cells[c] = EDGE_PARTIAL
+            self.edges[d] = (cells, starts, ends)
+
+    def allows(self, direction: str, coord: float) -> bool:
+        edge = self.edges.get(direction)
+        if edge is None:
+            return False
+        cells, starts, ends = edge
+        if 0.0 <= coord < len(cells):
+            k = cells[int(coord)]
+            if k != EDGE_PARTIAL:
+                return k == EDGE_FULL
+        i = bisect_right(starts, coord) - 1
+        return i >= 0 and coord <= ends[i]
+
+    def intervals(self, direction: str) -> Tuple[List[float], List[float]]:
+        edge = self.edges.get(direction)
+        if edge is None:
+            return [], []
+        return edge[1], edge[2]
+
+    def arrays(self, direction: str) -> Any:
+        """(starts, ends) as numpy arrays for searchsorted, made on first use."""
+        arrs = self._arrays.get(direction)
+        if arrs is None:
+            import numpy as np
+
+            starts, ends = self.intervals(direction)
+            arrs = (np.asarray(starts, dtype=np.float64), np.asarray(ends, dtype=np.float64))
+            self._arrays[direction] = arrs
+        return arrs
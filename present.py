@@ -0,0 +1,185 @@
+# present.py
+from typing import Any, Dict, List, Optional, Tuple
+
+import pygame
+
+from perf import PERF
+
+PRESENT_BACKENDS: Tuple[str, ...] = ("software", "sdl2")
+
+
+class SoftwarePresenter:
+    """Current path: the low-res frame is upscaled on the CPU and everything is blitted to the display surface."""
+
+    name = "software"
+
+    def __init__(self, title: str) -> None:
+        self.title = title
+
+    def create_screen(self, fullscreen: bool, size: Tuple[int, int]) -> pygame.Surface:
+        if fullscreen:
+            screen = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+        else:
+            screen = pygame.display.set_mode(size)
+        pygame.display.set_caption(self.title)
+        return screen
+
+    def set_mouse_grab(self, grab: bool) -> None:
+        pygame.event.set_grab(grab)
+
+    def draw_world(self, screen: pygame.Surface, frame: pygame.Surface) -> None:
+        w, h = screen.get_size()
+        screen.blit(pygame.transform.scale(frame, (w, h)), (0, 0))
+        PERF.count("surfaces")
+
+    def overlay(self, screen: pygame.Surface, surf: pygame.Surface, pos: Tuple[int, int] = (0, 0), size: Optional[Tuple[int, int]] = None) -> None:
+        if size is not None and size != surf.get_size():
+            surf = pygame.transform.scale(surf, size)
+        screen.blit(surf, pos)
+
+    def grain(self, screen: pygame.Surface, ring: Any) -> None:
+        ring.draw(screen)
+
+    def flip(self, screen: pygame.Surface) -> None:
+        pygame.display.flip()
+
+
+class SdlPresenter:
+    """
+    pygame._sdl2.video backend: the low-res frame is uploaded as a streaming
+    texture and SDL scales it; vignette, HUD and other overlays are cached
+    textures composited by SDL. Works with SDL's software renderer too.
+
+    The window belongs to SDL's renderer, so the UI of the other states is
+    drawn into an offscreen canvas that is uploaded when no world frame was
+    submitted.
+    """
+
+    name = "sdl2"
+
+    def __init__(self, title: str) -> None:
+        from pygame._sdl2 import video
+
+        self.title = title
+        self._video = video
+        self.window: Any = None
+        self.renderer: Any = None
+        self.canvas: Optional[pygame.Surface] = None
+
+        self._world: Optional[pygame.Surface] = None
+        self._world_tex: Any = None
+        self._canvas_tex: Any = None
+        self._layers: List[Tuple[pygame.Surface, Tuple[int, int], Optional[Tuple[int, int]]]] = []
+        self._points: List[Tuple[int, int, int]] = []
+
+        # текстуры оверлеев по id(surface); живут, пока используются каждый кадр
+        self._textures: Dict[int, Tuple[pygame.Surface, Any]] = {}
+        self._used: Dict[int, Tuple[pygame.Surface, Any]] = {}
+
+    def create_screen(self, fullscreen: bool, size: Tuple[int, int]) -> pygame.Surface:
+        video = self._video
+
+        # скрытое окно display-модуля нужно для Surface.convert()
+        if pygame.display.get_surface() is None:
+            pygame.display.set_mode((1, 1), pygame.HIDDEN)
+
+        self._textures.clear()
+        self._used.clear()
+        self._world_tex = None
+        self._canvas_tex = None
+        self.renderer = None
+        if self.window is not None:
+            self.window.destroy()
+            self.window = None
+
+        if fullscreen:
+            window = video.Window(self.title, fullscreen_desktop=True)
+        else:
+            window = video.Window(self.title, size=size)
+        try:
+            renderer = video.Renderer(window, accelerated=-1)
+        except Exception:
+            window.destroy()
+            raise
+
+        self.window = window
+        self.renderer = renderer
+        self.canvas = pygame.Surface(window.size).convert()
+        return self.canvas
+
+    def set_mouse_grab(self, grab: bool) -> None:
+        if self.window is not None:
+            self.window.grab = grab
+            self.window.relative_mouse = grab
+
+    def _texture(self, surf: pygame.Surface) -> Any:
+        key = id(surf)
+        entry = self._used.get(key) or self._textures.get(key)
+        if entry is None or entry[0] is not surf:
+            entry = (surf, self._video.Texture.from_surface(self.renderer, surf))
+        self._used[key] = entry
+        return entry[1]
+
+    def draw_world(self, screen: pygame.Surface, frame: pygame.Surface) -> None:
+        self._world = frame
+        self._layers = []
+        self._points = []
+
+    def overlay(self, screen: pygame.Surface, surf: pygame.Surface, pos: Tuple[int, int] = (0, 0), size: Optional[Tuple[int, int]] = None) -> None:
+        if self._world is None:
+            # кадр без мира (меню и т.п.) — рисуем прямо в canvas
+            if size is not None and size != surf.get_size():
+                surf = pygame.transform.scale(surf, size)
+            screen.blit(surf, pos)
+            return
+        self._layers.append((surf, pos, size))
+
+    def grain(self, screen: pygame.Surface, ring: Any) -> None:
+        if self._world is None:
+            ring.draw(screen)
+            return
+        self._points.extend(ring.next_points(screen.get_size()))
+
+    def flip(self, screen: pygame.Surface) -> None:
+        r = self.renderer
+        r.draw_color = (0, 0, 0, 255)
+        r.clear()
+        w, h = self.window.size
+
+        if self._world is not None:
+            fw, fh = self._world.get_size()
+            if self._world_tex is None or (self._world_tex.width, self._world_tex.height) != (fw, fh):
+                self._world_tex = self._video.Texture(r, (fw, fh), streaming=True)
+            self._world_tex.update(self._world)
+            self._world_tex.draw(dstrect=(0, 0, w, h))
+
+            for surf, pos, size in self._layers:
+                sw, sh = size if size is not None else surf.get_size()
+                self._texture(surf).draw(dstrect=(pos[0], pos[1], sw, sh))
+
+            for x, y, c in self._points:
+                r.draw_color = (c, c, c, 255)
+                r.draw_point((x, y))
+        else:
+            cw, ch = screen.get_size()
+            if self._canvas_tex is None or (self._canvas_tex.width, self._canvas_tex.height) != (cw, ch):
+                self._canvas_tex = self._video.Texture(r, (cw, ch), streaming=True)
+            self._canvas_tex.update(screen)
+            self._canvas_tex.draw(dstrect=(0, 0, w, h))
+
+        r.present()
+
+        self._textures = self._used
+        self._used = {}
+        self._world = None
+        self._layers = []
+        self._points = []
+
+
+def create_presenter(backend: str, title: str) -> Any:
+    if backend == "sdl2":
+        try:
+            return SdlPresenter(title)
+        except Exception as e:
+            print(f"Warning: SDL2 present backend unavailable ({e}). Using software.")
+    return SoftwarePresenter(title)
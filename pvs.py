@@ -0,0 +1,221 @@
+# pvs.py
+import time
+import weakref
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+from settings import C
+from tiles import FLAG_BLOCKING
+
+
+class _Bump:
+    __slots__ = ("x", "y", "parent")
+
+    def __init__(self, x: int, y: int, parent: Optional["_Bump"]) -> None:
+        self.x, self.y, self.parent = x, y, parent
+
+
+class _View:
+    """Wedge of sight lines between a shallow and a steep line, each [xi, yi, xf, yf]."""
+
+    __slots__ = ("shallow", "steep", "shallow_bump", "steep_bump")
+
+    def __init__(self, shallow: List[int], steep: List[int], shallow_bump: Optional[_Bump], steep_bump: Optional[_Bump]) -> None:
+        self.shallow = shallow
+        self.steep = steep
+        self.shallow_bump = shallow_bump
+        self.steep_bump = steep_bump
+
+
+def _rel(line: List[int], x: int, y: int) -> int:
+    # > 0: точка слева от линии (xi, yi) -> (xf, yf), < 0: справа, 0: на линии
+    xi, yi, xf, yf = line
+    return (yf - yi) * (xf - x) - (xf - xi) * (yf - y)
+
+
+def _add_shallow_bump(view: _View, x: int, y: int) -> None:
+    line = view.shallow
+    line[2], line[3] = x, y
+    view.shallow_bump = _Bump(x, y, view.shallow_bump)
+    b = view.steep_bump
+    while b is not None:
+        if _rel(line, b.x, b.y) < 0:
+            line[0], line[1] = b.x, b.y
+        b = b.parent
+
+
+def _add_steep_bump(view: _View, x: int, y: int) -> None:
+    line = view.steep
+    line[2], line[3] = x, y
+    view.steep_bump = _Bump(x, y, view.steep_bump)
+    b = view.shallow_bump
+    while b is not None:
+        if _rel(line, b.x, b.y) > 0:
+            line[0], line[1] = b.x, b.y
+        b = b.parent
+
+
+def _alive(view: _View) -> bool:
+    # вид схлопнулся в одну линию через угол исходной клетки — через него ничего не видно
+    sh, st = view.shallow, view.steep
+    if _rel(sh, st[0], st[1]) == 0 and _rel(sh, st[2], st[3]) == 0:
+        return not (_rel(sh, 0, 1) == 0 or _rel(sh, 1, 0) == 0)
+    return True
+
+
+def _quadrant(blocked: bytes, seen: bytearray, w: int, sx: int, sy: int, dx: int, dy: int, ext_x: int, ext_y: int) -> None:
+    """Precise permissive field of view over one quadrant; marks reached cells in seen."""
+    far = ext_x + ext_y + 1
+    views = [_View([0, 1, far, 0], [1, 0, 0, far], None, None)]
+    n = len(seen)
+
+    for i in range(1, ext_x + ext_y + 1):
+        if not views:
+            return
+        vi = 0
+        for j in range(max(0, i - ext_x), min(i, ext_y) + 1):
+            x, y = i - j, j
+            # первый вид, чья крутая линия выше правого нижнего угла клетки
+            while vi < len(views) and _rel(views[vi].steep, x + 1, y) >= 0:
+                vi += 1
+            if vi >= len(views):
+                break
+            view = views[vi]
+            # левый верхний угол не выше пологой линии — клетка между видами
+            if _rel(view.shallow, x, y + 1) <= 0:
+                continue
+
+            idx = (sy + y * dy) * w + sx + x * dx
+            seen[n - 1 - idx] = 49  # "1"
+            if not blocked[idx]:
+                continue
+
+            above = _rel(view.shallow, x + 1, y) < 0
+            below = _rel(view.steep, x, y + 1) > 0
+            if above and below:
+                # клетка закрывает вид целиком
+                del views[vi]
+            elif above:
+                _add_shallow_bump(view, x, y + 1)
+                if not _alive(view):
+                    del views[vi]
+            elif below:
+                _add_steep_bump(view, x + 1, y)
+                if not _alive(view):
+                    del views[vi]
+            else:
+                # стена посередине вида: он делится на пологий и крутой
+                steeper = _View(list(view.shallow), list(view.steep), view.shallow_bump, view.steep_bump)
+                views.insert(vi + 1, steeper)
+                _add_steep_bump(view, x + 1, y)
+                if not _alive(view):
+                    del views[vi]
+                _add_shallow_bump(steeper, x, y + 1)
+                if not _alive(steeper):
+                    views.remove(steeper)
+
+
+class CellVisibility:
+    """
+    Potentially visible set per World. For a player cell, the cells that some
+    straight line from anywhere inside it reaches without crossing a wall or the
+    door (precise permissive field of view, so the set is exact, not sampled).
+    Wrap portals do not count: sprites are projected at their own position, so
+    nothing seen through a portal is ever drawn as a sprite.
+
+    Masks are bitsets (bit y * w + x), built lazily per cell. prefetch() builds
+    the player's neighbourhood within a time budget; the renderer does not cull
+    until the player's cell is ready, so a build never stalls a frame.
+    """
+
+    def __init__(self, world) -> None:
+        self.w, self.h = world.w, world.h
+        self.blocked = world.mask(FLAG_BLOCKING)
+        self._masks: Dict[int, int] = {}
+        self._queue: Deque[int] = deque()
+        self._center = -1
+
+    def ready(self, cx: int, cy: int) -> bool:
+        if not (0 <= cx < self.w and 0 <= cy < self.h):
+            return True
+        return cy * self.w + cx in self._masks
+
+    def visible_mask(self, cx: int, cy: int) -> int:
+        """Bitset of the cells visible from cell (cx, cy); built now if needed."""
+        if not (0 <= cx < self.w and 0 <= cy < self.h):
+            return (1 << (self.w * self.h)) - 1
+        key = cy * self.w + cx
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = self._build(cx, cy)
+            self._masks[key] = mask
+        return mask
+
+    def is_visible(self, from_cell: Tuple[int, int], x: float, y: float, radius: float = 0.0) -> bool:
+        """Whether any cell within radius (a box) of point (x, y) is visible from from_cell."""
+        mask = self.visible_mask(*from_cell)
+        w, h = self.w, self.h
+        x0 = min(max(int(x - radius), 0), w - 1)
+        x1 = min(max(int(x + radius), 0), w - 1)
+        y0 = min(max(int(y - radius), 0), h - 1)
+        y1 = min(max(int(y + radius), 0), h - 1)
+        row = (1 << (x1 - x0 + 1)) - 1
+        for yy in range(y0, y1 + 1):
+            if (mask >> (yy * w + x0)) & row:
+                return True
+        return False
+
+    def prefetch(self, cell: Tuple[int, int], budget_ms: float) -> None:
+        """Builds queued masks around cell until budget_ms is spent (at least one per call)."""
+        w, h = self.w, self.h
+        cx, cy = cell
+        center = cy * w + cx
+        if center != self._center and 0 <= cx < w and 0 <= cy < h:
+            # новая клетка игрока: сначала она, потом соседи по расстоянию
+            self._center = center
+            r = C.PVS_PREFETCH_RADIUS
+            near = [
+                (abs(dx) + abs(dy), (cy + dy) * w + cx + dx)
+                for dy in range(-r, r + 1)
+                for dx in range(-r, r + 1)
+                if 0 <= cx + dx < w and 0 <= cy + dy < h
+            ]
+            near.sort()
+            self._queue = deque(
+                i for _, i in near if i not in self._masks and (i == center or not self.blocked[i])
+            )
+
+        t0 = time.perf_counter()
+        while self._queue:
+            i = self._queue.popleft()
+            if i not in self._masks:
+                self._masks[i] = self._build(i % w, i // w)
+            if (time.perf_counter() - t0) * 1000.0 >= budget_ms:
+                break
+
+    def _build(self, cx: int, cy: int) -> int:
+        w, h = self.w, self.h
+        n = w * h
+        # строка "0"/"1" задом наперёд: int(seen, 2) сразу даёт битсет
+        seen = bytearray(b"0") * n
+        seen[n - 1 - (cy * w + cx)] = 49
+        blocked = self.blocked
+        for dx, dy, ext_x, ext_y in (
+            (1, 1, w - 1 - cx, h - 1 - cy),
+            (-1, 1, cx, h - 1 - cy),
+            (1, -1, w - 1 - cx, cy),
+            (-1, -1, cx, cy),
+        ):
+            _quadrant(blocked, seen, w, cx, cy, dx, dy, ext_x, ext_y)
+        return int(seen, 2)
+
+
+_visibility: "weakref.WeakKeyDictionary[object, CellVisibility]" = weakref.WeakKeyDictionary()
+
+
+def visibility_for(world) -> CellVisibility:
+    vis = _visibility.get(world)
+    if vis is None:
+        vis = CellVisibility(world)
+        _visibility[world] = vis
+    return vis
@@ -0,0 +1,334 @@
+# raycast.py
+import math
+import weakref
+from typing import Any, Dict, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # numpy is optional: only the "python" engine is available then
+    np = None
+
+from settings import C, clamp
+from perf import PERF
+from tiles import TILE_NONE, TILE_WALL
+
+# the per-column tile buffer holds tile IDs (tiles.py): 0 = no hit, otherwise the atlas material
+
+WallHits = Tuple[Any, Any, Any, Any]
+
+# Per-column ray setup depends only on the view (dir/plane) and the columns, not on
+# the position: kept between frames so walking without turning skips it.
+_ray_setups: Dict[tuple, Any] = {}
+_RAY_SETUP_SLOTS = 32
+
+
+def _cached_setup(key: tuple) -> Any:
+    setup = _ray_setups.get(key)
+    PERF.count("ray_setup_hit" if setup is not None else "ray_setup_miss")
+    return setup
+
+
+def _store_setup(key: tuple, setup: Any) -> Any:
+    if len(_ray_setups) >= _RAY_SETUP_SLOTS:
+        _ray_setups.clear()
+    _ray_setups[key] = setup
+    return setup
+
+
+def ray_setup_python(p, render_w: int) -> List[Tuple[float, float, float, float, int, int]]:
+    """(rayDirX, rayDirY, deltaDistX, deltaDistY, stepX, stepY) per column."""
+    key = ("python", p.dirx, p.diry, p.planex, p.planey, render_w)
+    setup = _cached_setup(key)
+    if setup is not None:
+        return setup
+
+    cols = []
+    for x in range(render_w):
+        cameraX = 2.0 * x / render_w - 1.0
+        rayDirX = p.dirx + p.planex * cameraX
+        rayDirY = p.diry + p.planey * cameraX
+        deltaDistX = abs(1.0 / rayDirX) if abs(rayDirX) > 1e-12 else 1e30
+        deltaDistY = abs(1.0 / rayDirY) if abs(rayDirY) > 1e-12 else 1e30
+        cols.append((rayDirX, rayDirY, deltaDistX, deltaDistY, -1 if rayDirX < 0 else 1, -1 if rayDirY < 0 else 1))
+    return _store_setup(key, cols)
+
+
+
+def cast_walls_python(world, p, render_w: int, tex_w: int) -> WallHits:
+    """Scalar DDA, one ray per column. Returns (perp, side, tex_x, tile) lists."""
+    max_steps = world.w * world.h * 4
+
+    px, py = p.x, p.y
+    tiles = world.tiles
+    gw = world.w
+
+    perp_buf: List[float] = [1e9] * render_w
+    side_buf: List[int] = [0] * render_w
+    tex_x_buf: List[int] = [0] * render_w
+    tile_buf: List[int] = [TILE_NONE] * render_w
+    steps = 0
+
+    for x, (rayDirX, rayDirY, deltaDistX, deltaDistY, stepX, stepY) in enumerate(ray_setup_python(p, render_w)):
+        mapX = int(px)
+        mapY = int(py)
+
+        if stepX < 0:
+            sideDistX = (px - mapX) * deltaDistX
+        else:
+            sideDistX = (mapX + 1.0 - px) * deltaDistX
+
+        if stepY < 0:
+            sideDistY = (py - mapY) * deltaDistY
+        else:
+            sideDistY = (mapY + 1.0 - py) * deltaDistY
+
+        hit = False
+        side = 0
+        tile = TILE_WALL
+        perp = 1e9
+
+        for step_i in range(max_steps):
+            if sideDistX < sideDistY:
+                sideDistX += deltaDistX
+                mapX += stepX
+                side = 0
+                traveled = sideDistX - deltaDistX
+            else:
+                sideDistY += deltaDistY
+                mapY += stepY
+                side = 1
+                traveled = sideDistY - deltaDistY
+
+            # порталы по краям
+            if mapY < 0:
+                x_at = px + rayDirX * traveled
+                if world.portal_allows("N", x_at):
+                    mapY = world.h - 1
+                else:
+                    hit = True
+                    tile = TILE_WALL
+                    perp = traveled
+                    break
+            elif mapY >= world.h:
+                x_at = px + rayDirX * traveled
+                if world.portal_allows("S", x_at):
+                    mapY = 0
+                else:
+                    hit = True
+                    tile = TILE_WALL
+                    perp = traveled
+                    break
+
+            if mapX < 0:
+                y_at = py + rayDirY * traveled
+                if world.portal_allows("W", y_at):
+                    mapX = world.w - 1
+                else:
+                    hit = True
+                    tile = TILE_WALL
+                    perp = traveled
+                    break
+            elif mapX >= world.w:
+                y_at = py + rayDirY * traveled
+                if world.portal_allows("E", y_at):
+                    mapX = 0
+                else:
+                    hit = True
+                    tile = TILE_WALL
+                    perp = traveled
+                    break
+
+            # после порталов mapX/mapY всегда внутри карты
+            tile = tiles[mapY * gw + mapX]
+            if tile != TILE_NONE:
+                hit = True
+                perp = traveled
+                break
+
+        steps += step_i + 1
+        if not hit:
+            continue
+
+        perp = max(perp, C.MIN_WALL_DIST)
+
+        if side == 0:
+            wallX = py + perp * rayDirY
+        else:
+            wallX = px + perp * rayDirX
+        wallX -= math.floor(wallX)
+
+        texX = int(wallX * tex_w)
+        if side == 0 and rayDirX > 0:
+            texX = tex_w - texX - 1
+        if side == 1 and rayDirY < 0:
+            texX = tex_w - texX - 1
+
+        perp_buf[x] = perp
+        side_buf[x] = side
+        tex_x_buf[x] = int(clamp(texX, 0, tex_w - 1))
+        tile_buf[x] = tile
+
+    PERF.count("dda_steps", steps)
+    return perp_buf, side_buf, tex_x_buf, tile_buf
+
+
+# ------------------------------------------------------------
+# NumPy batch engine
+# ------------------------------------------------------------
+
+_grid_cache: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+
+
+def grid_tiles(world) -> "np.ndarray":
+    """World grid as a (h, w) uint8 array of tile IDs, built once per World."""
+    tiles = _grid_cache.get(world)
+    if tiles is None:
+        tiles = np.frombuffer(bytes(world.tiles), dtype=np.uint8).reshape(world.h, world.w)
+        _grid_cache[world] = tiles
+    return tiles
+
+
+def portal_mask(world, direction: str, coord: "np.ndarray") -> "np.ndarray":
+    """Vectorised World.portal_allows: one searchsorted over the merged intervals of the edge."""
+    starts, ends = world.portals.arrays(direction)
+    if starts.size == 0:
+        return np.zeros(coord.shape, dtype=bool)
+    i = np.searchsorted(starts, coord, side="right") - 1
+    return (i >= 0) & (coord <= ends[np.maximum(i, 0)])
+
+
+def ray_setup_numpy(p, render_w: int, x0: int, x1: int) -> Tuple["np.ndarray", ...]:
+    """(rayDirX, rayDirY, deltaDistX, deltaDistY, negX, negY, stepX, stepY) for columns [x0, x1), read-only."""
+    key = ("numpy", p.dirx, p.diry, p.planex, p.planey, render_w, x0, x1)
+    setup = _cached_setup(key)
+    if setup is not None:
+        return setup
+
+    cameraX = 2.0 * np.arange(x0, x1, dtype=np.float64) / render_w - 1.0
+    rayDirX = p.dirx + p.planex * cameraX
+    rayDirY = p.diry + p.planey * cameraX
+
+    with np.errstate(divide="ignore"):
+        deltaDistX = np.where(np.abs(rayDirX) > 1e-12, np.abs(1.0 / rayDirX), 1e30)
+        deltaDistY = np.where(np.abs(rayDirY) > 1e-12, np.abs(1.0 / rayDirY), 1e30)
+
+    negX = rayDirX < 0
+    negY = rayDirY < 0
+    stepX = np.where(negX, -1, 1)
+    stepY = np.where(negY, -1, 1)
+
+    arrays = (rayDirX, rayDirY, deltaDistX, deltaDistY, negX, negY, stepX, stepY)
+    for a in arrays:
+        a.setflags(write=False)
+    return _store_setup(key, arrays)
+
+
+def cast_walls_numpy(world, p, render_w: int, tex_w: int, x0: int = 0, x1: int = -1) -> WallHits:
+    """
+    All columns' DDA advanced together. Same outputs as cast_walls_python,
+    as arrays: perp (float64), side (int8), tex_x (int32), tile (uint8).
+    x0/x1 restrict the batch to screen columns [x0, x1) (one strip).
+    """
+    tiles = grid_tiles(world)
+    gw, gh = world.w, world.h
+    max_steps = gw * gh * 4
+
+    px, py = p.x, p.y
+
+    if x1 < 0:
+        x1 = render_w
+    n = x1 - x0
+    rayDirX, rayDirY, deltaDistX, deltaDistY, negX, negY, stepX, stepY = ray_setup_numpy(p, render_w, x0, x1)
+
+    mapX = np.full(n, int(px), dtype=np.int64)
+    mapY = np.full(n, int(py), dtype=np.int64)
+
+    sideDistX = np.where(negX, (px - mapX) * deltaDistX, (mapX + 1.0 - px) * deltaDistX)
+    sideDistY = np.where(negY, (py - mapY) * deltaDistY, (mapY + 1.0 - py) * deltaDistY)
+
+    perp = np.full(n, 1e9)
+    side = np.zeros(n, dtype=np.int8)
+    tile = np.zeros(n, dtype=np.uint8)
+
+    # indices of rays that are still marching
+    live = np.arange(n)
+    steps = 0
+
+    for _ in range(max_steps):
+        if live.size == 0:
+            break
+        steps += live.size
+
+        sdx = sideDistX[live]
+        sdy = sideDistY[live]
+        ddx = deltaDistX[live]
+        ddy = deltaDistY[live]
+        mx = mapX[live]
+        my = mapY[live]
+
+        step_x = sdx < sdy
+        traveled = np.where(step_x, sdx, sdy)
+        sdx = np.where(step_x, sdx + ddx, sdx)
+        sdy = np.where(step_x, sdy, sdy + ddy)
+        mx = np.where(step_x, mx + stepX[live], mx)
+        my = np.where(step_x, my, my + stepY[live])
+        s = np.where(step_x, 0, 1).astype(np.int8)
+
+        # порталы по краям: wrap or treat the map edge as a wall
+        edge_hit = np.zeros(live.size, dtype=bool)
+
+        out_n = my < 0
+        out_s = my >= gh
+        if out_n.any() or out_s.any():
+            x_at = px + rayDirX[live] * traveled
+            ok_n = out_n & portal_mask(world, "N", x_at)
+            ok_s = out_s & portal_mask(world, "S", x_at)
+            my = np.where(ok_n, gh - 1, np.where(ok_s, 0, my))
+            edge_hit |= (out_n & ~ok_n) | (out_s & ~ok_s)
+
+        out_w = (mx < 0) & ~edge_hit
+        out_e = (mx >= gw) & ~edge_hit
+        if out_w.any() or out_e.any():
+            y_at = py + rayDirY[live] * traveled
+            ok_w = out_w & portal_mask(world, "W", y_at)
+            ok_e = out_e & portal_mask(world, "E", y_at)
+            mx = np.where(ok_w, gw - 1, np.where(ok_e, 0, mx))
+            edge_hit |= (out_w & ~ok_w) | (out_e & ~ok_e)
+
+        cell = np.full(live.size, TILE_WALL, dtype=np.uint8)
+        inside = ~edge_hit
+        cell[inside] = tiles[my[inside], mx[inside]]
+        hit = cell != TILE_NONE
+
+        sideDistX[live] = sdx
+        sideDistY[live] = sdy
+        mapX[live] = mx
+        mapY[live] = my
+
+        if hit.any():
+            done = live[hit]
+            perp[done] = traveled[hit]
+            side[done] = s[hit]
+            tile[done] = cell[hit]
+            live = live[~hit]
+
+    hit_any = tile != TILE_NONE
+    perp = np.where(hit_any, np.maximum(perp, C.MIN_WALL_DIST), 1e9)
+
+    wallX = np.where(side == 0, py + perp * rayDirY, px + perp * rayDirX)
+    wallX -= np.floor(wallX)
+
+    tex_x = (wallX * tex_w).astype(np.int32)
+    flip = ((side == 0) & (rayDirX > 0)) | ((side == 1) & (rayDirY < 0))
+    tex_x = np.where(flip, tex_w - tex_x - 1, tex_x)
+    tex_x = np.clip(tex_x, 0, tex_w - 1)
+
+    PERF.count("dda_steps", steps)
+    return perp, side, tex_x, tile
+
+
+WALL_ENGINES = {
+    "python": cast_walls_python,
+}
+if np is not None:
+    WALL_ENGINES["numpy"] = cast_walls_numpy
@@ -1,50 +1,229 @@
 # renderer.py
 import math
 import random
-from typing import List, Optional, Tuple
+import time
+import weakref
+from typing import Dict, List, Optional, Tuple
 
 import pygame
 
-from settings import C, clamp
-
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
-def make_backrooms_wall_texture(size: int = 256) -> pygame.Surface:
+from settings import C, clamp
+from disk_cache import content_key, load_bytes, save_bytes
+from raycast import WALL_ENGINES
+from tiles import TILE_DOOR, TILE_NONE, TILE_WALL, TILE_WALL_EXIT, TILE_WALL_STAINED, TILE_WALL_VENT, WALL_TILES
+from atlas import TextureAtlas
+from surface_cache import SurfaceCache
+from hud import HudLayer
+from fonts import FontRegistry, TextCache
+from grain import GrainRing
+from mipmap import build_mip_chain, mip_level
+from dynres import DynamicResolution
+from present import SoftwarePresenter
+from perf import PERF
+from pvs import visibility_for
+
+try:
+    from texmap import WallTextureMapper
+    from floorcast import FLOOR_QUALITIES, FloorCaster, make_surface_texture
+    from parallel import PARALLEL_BACKENDS, create_strip_backend
+except ImportError:  # numpy is optional: walls are blitted column by column then
+    WallTextureMapper = None
+    FloorCaster = None
+    FLOOR_QUALITIES = ("off",)
+    PARALLEL_BACKENDS = ("serial",)
+
+# "blit" = one cached 1px Surface per column, "surfarray" = whole frame as one pixel array
+WALL_MAPPERS: Tuple[str, ...] = ("blit", "surfarray") if WallTextureMapper is not None else ("blit",)
+
+
+_WALL_TEX_VERSION = 1
+
+
+def _wall_texture_pixels_numpy(size: int, seed: int) -> bytes:
+    rng = np.random.default_rng(seed)
+    k = size / 256.0
+    img = np.empty((size, size, 3), dtype=np.int16)
+    img[:, :] = (210, 198, 120)
+
+    period = max(2, int(round(18 * k)))
+    width = max(1, int(round(6 * k)))
+    for x in range(0, size, period):
+        img[:, x:x + width] = (200, 190, 115) + rng.integers(-8, 9, size=3)
+
+    n = int(round(1400 * k * k))
+    xs = rng.integers(0, size, n)
+    ys = rng.integers(0, size, n)
+    ds = rng.integers(1, 4, n)
+    cs = rng.integers(140, 205, n)
+    cols = np.stack([cs, cs - 8, cs - 40], axis=1)
+    for d in (1, 2, 3):
+        sel = ds == d
+        bx, by, bc = xs[sel], ys[sel], cols[sel]
+        dpx = max(1, int(round(d * k)))
+        for oy in range(dpx):
+            for ox in range(dpx):
+                ok = (bx + ox < size) & (by + oy < size)
+                img[by[ok] + oy, bx[ok] + ox] = bc[ok]
+
+    n = int(round(9000 * k * k))
+    xs = rng.integers(0, size, n)
+    ys = rng.integers(0, size, n)
+    cs = rng.integers(160, 220, n)
+    img[ys, xs] = np.stack([cs, cs - 10, cs - 55], axis=1)
+
+    return img.astype(np.uint8).tobytes()
+
+
+def _wall_texture_pixels_python(size: int, seed: int) -> bytes:
+    rng = random.Random(seed)
+    k = size / 256.0
     surf = pygame.Surface((size, size))
     surf.fill((210, 198, 120))
 
-    for x in range(0, size, 18):
+    period = max(2, int(round(18 * k)))
+    width = max(1, int(round(6 * k)))
+    for x in range(0, size, period):
         col = (
-            200 + random.randint(-8, 8),
-            190 + random.randint(-8, 8),
-            115 + random.randint(-8, 8),
+            200 + rng.randint(-8, 8),
+            190 + rng.randint(-8, 8),
+            115 + rng.randint(-8, 8),
         )
-        pygame.draw.rect(surf, col, (x, 0, 6, size))
+        pygame.draw.rect(surf, col, (x, 0, width, size))
 
-    for _ in range(1400):
-        x = random.randrange(size)
-        y = random.randrange(size)
-        d = random.randrange(1, 4)
-        c = random.randrange(140, 205)
+    for _ in range(int(round(1400 * k * k))):
+        x = rng.randrange(size)
+        y = rng.randrange(size)
+        d = max(1, int(round(rng.randrange(1, 4) * k)))
+        c = rng.randrange(140, 205)
         surf.fill((c, c - 8, c - 40), (x, y, d, d))
 
-    for _ in range(9000):
-        x = random.randrange(size)
-        y = random.randrange(size)
-        c = random.randrange(160, 220)
+    for _ in range(int(round(9000 * k * k))):
+        x = rng.randrange(size)
+        y = rng.randrange(size)
+        c = rng.randrange(160, 220)
         surf.set_at((x, y), (c, c - 10, c - 55))
 
-    return surf.convert()
+    return pygame.image.tobytes(surf, "RGB")
 
 
-def vignette_surface(w: int, h: int) -> pygame.Surface:
-    surf = pygame.Surface((w, h), pygame.SRCALPHA)
+def make_backrooms_wall_texture(size: int = 256, seed: Optional[int] = None, cache_dir: Optional[str] = None) -> pygame.Surface:
+    if seed is None:
+        seed = C.TEXTURE_SEED
+    backend = "numpy" if np is not None else "python"
+
+    # имя файла = хэш всех параметров, полностью определяющих пиксели
+    name = "walltex_" + content_key("walltex", _WALL_TEX_VERSION, backend, size, seed) + ".rgb"
+    data = load_bytes(cache_dir, name, size * size * 3)
+    if data is None:
+        if np is not None:
+            data = _wall_texture_pixels_numpy(size, seed)
+        else:
+            data = _wall_texture_pixels_python(size, seed)
+        save_bytes(cache_dir, name, data)
+
+    return pygame.image.frombytes(data, (size, size), "RGB").convert()
+
+
+def make_wall_variants(base: pygame.Surface, door_overlay: pygame.Surface, seed: Optional[int] = None) -> Dict[int, pygame.Surface]:
+    """Textures of every wall material by tile ID, all derived from the base wall texture."""
+    if seed is None:
+        seed = C.TEXTURE_SEED
+    rng = random.Random(seed + 7)
+    size = base.get_width()
+    k = size / 256.0
+
+    door = base.copy()
+    door.blit(door_overlay, (0, 0))
+
+    # подтёки и пятна сырости
+    stained = base.copy()
+    stains = pygame.Surface((size, size), pygame.SRCALPHA)
+    for _ in range(14):
+        cx, cy = rng.randrange(size), rng.randrange(size // 3)
+        rw, rh = int(rng.randrange(20, 70) * k), int(rng.randrange(14, 40) * k)
+        a = rng.randrange(40, 90)
+        pygame.draw.ellipse(stains, (70, 55, 20, a), (cx - rw // 2, cy - rh // 2, rw, rh))
+        drip = int(rng.randrange(40, 160) * k)
+        pygame.draw.rect(stains, (70, 55, 20, a // 2), (cx - max(1, int(2 * k)), cy, max(2, int(4 * k)), drip))
+    stained.blit(stains, (0, 0))
+
+    # решётка вентиляции
+    vent = base.copy()
+    x0, y0 = int(size * 0.22), int(size * 0.56)
+    vw, vh = int(size * 0.56), int(size * 0.26)
+    pygame.draw.rect(vent, (95, 92, 80), (x0, y0, vw, vh))
+    pygame.draw.rect(vent, (60, 58, 50), (x0, y0, vw, vh), max(1, int(4 * k)))
+    slat = max(2, int(8 * k))
+    for y in range(y0 + slat, y0 + vh - slat // 2, slat * 2):
+        pygame.draw.rect(vent, (25, 24, 20), (x0 + slat, y, vw - 2 * slat, slat))
+
+    # табличка EXIT
+    exit_tex = base.copy()
+    ew, eh = int(size * 0.5), int(size * 0.2)
+    ex, ey = (size - ew) // 2, int(size * 0.12)
+    pygame.draw.rect(exit_tex, (20, 120, 45), (ex, ey, ew, eh))
+    pygame.draw.rect(exit_tex, (12, 70, 28), (ex, ey, ew, eh), max(1, int(3 * k)))
+    try:
+        font = pygame.font.Font(None, max(8, int(eh * 0.95)))
+        # стены сэмплируются справа налево (см. flip texX в raycast) — надпись зеркалим заранее
+        txt = pygame.transform.flip(font.render("EXIT", True, (235, 245, 235)), True, False)
+        exit_tex.blit(txt, (size // 2 - txt.get_width() // 2, ey + eh // 2 - txt.get_height() // 2))
+    except pygame.error:
+        pass
+
+    return {
+        TILE_WALL: base,
+        TILE_DOOR: door,
+        TILE_WALL_STAINED: stained,
+        TILE_WALL_VENT: vent,
+        TILE_WALL_EXIT: exit_tex,
+    }
+
+
+_VIGNETTE_VERSION = 1
+_vignette_memo: Dict[Tuple[int, int], pygame.Surface] = {}
+
+
+def vignette_alpha(w: int, h: int) -> bytes:
     cx, cy = w / 2, h / 2
     maxd = math.hypot(cx, cy)
+    if np is not None:
+        xs = (np.arange(w, dtype=np.float64) - cx) ** 2
+        ys = (np.arange(h, dtype=np.float64) - cy) ** 2
+        d = np.sqrt(ys[:, None] + xs[None, :]) / maxd
+        return (170.0 * d ** 1.8).astype(np.uint8).tobytes()
+
+    out = bytearray(w * h)
     for y in range(h):
+        dy = y - cy
+        row = y * w
         for x in range(w):
-            d = math.hypot(x - cx, y - cy) / maxd
-            a = int(170 * (d ** 1.8))
-            surf.set_at((x, y), (0, 0, 0, a))
+            d = math.hypot(x - cx, dy) / maxd
+            out[row + x] = int(170 * (d ** 1.8))
+    return bytes(out)
+
+
+def vignette_surface(w: int, h: int, cache_dir: Optional[str] = None) -> pygame.Surface:
+    surf = _vignette_memo.get((w, h))
+    if surf is not None:
+        return surf
+
+    name = f"vignette_v{_VIGNETTE_VERSION}_{w}x{h}.a8"
+    alpha = load_bytes(cache_dir, name, w * h)
+    if alpha is None:
+        alpha = vignette_alpha(w, h)
+        save_bytes(cache_dir, name, alpha)
+
+    # чёрный RGBA, альфа из маски; в формат экрана, иначе SDL конвертирует каждый пиксель на каждом blit
+    rgba = bytearray(w * h * 4)
+    rgba[3::4] = alpha
+    surf = pygame.image.frombytes(bytes(rgba), (w, h), "RGBA").convert_alpha()
+    _vignette_memo[(w, h)] = surf
     return surf
 
 
@@ -59,9 +238,17 @@ class Renderer:
         door_img: pygame.Surface,
         victory_img: pygame.Surface,
         end_img: pygame.Surface,
+        cache_dir: Optional[str] = None,
+        presenter=None,
     ):
         self.screen = screen
-        self.render = pygame.Surface((C.RENDER_W, C.RENDER_H))
+        self.cache_dir = cache_dir
+        # куда уходит готовый кадр: CPU-масштабирование или SDL-текстуры
+        self.presenter = presenter if presenter is not None else SoftwarePresenter("")
+        # внутреннее разрешение; меняется динамически (см. set_render_size)
+        self.render_w = C.RENDER_W
+        self.render_h = C.RENDER_H
+        self.render = pygame.Surface((self.render_w, self.render_h))
         self.wall_tex = wall_tex
         self.monster_img = monster_img
         self.heart_img = heart_img
@@ -71,23 +258,149 @@ class Renderer:
         self.end_img = end_img
 
         self.door_overlay = pygame.transform.smoothscale(door_img, (C.TEXTURE_SIZE, C.TEXTURE_SIZE))
-        self.door_wall_tex = self.wall_tex.copy()
-        self.door_wall_tex.blit(self.door_overlay, (0, 0))
+
+        # все материалы стен по ID тайла: стены, дверь, мини-карта
+        self.atlas = TextureAtlas(make_wall_variants(self.wall_tex, self.door_overlay))
+        self.door_wall_tex = self.atlas.texture(TILE_DOOR)
         self.door_tex = self.door_wall_tex
 
-        self.font = pygame.font.SysFont("consolas", 18)
-        self.big_font = pygame.font.SysFont("consolas", 44, bold=True)
-        self.logo_font = pygame.font.SysFont("consolas", 74, bold=True)
+        # "python" = per-column scalar DDA, "numpy" = all columns as one batch
+        self.set_wall_engine("numpy" if "numpy" in WALL_ENGINES else "python")
+
+        # pre-scaled + pre-shaded 1px columns for walls and the door
+        self.column_cache = SurfaceCache(C.COLUMN_CACHE_MB * 1024 * 1024, "column_cache")
+        # полосы яркости и шаг высоты столбцов; без них blit-путь совпадает с surfarray попиксельно
+        self.quantize = True
+        # отмасштабированные и затуманенные спрайты (монстр, зачётки)
+        self.sprite_cache = SurfaceCache(C.SPRITE_CACHE_MB * 1024 * 1024, "sprite_cache")
+
+        # мипы: столбцы и спрайты масштабируются с ближайшего уровня, а не с полной текстуры
+        self._mip_chains: Dict[int, List[pygame.Surface]] = {id(c[0]): c for c in self.atlas.mips}
+        for tex in (self.monster_img, self.zachet_img):
+            self._mips(tex)
+
+        # стены полосами по столбцам: "serial" | "threads" | "processes"
+        self.parallel = "serial"
+        self.strips = 1
+        self.strip_backend = None
+        self.strip_ms: List[float] = []
+
+        self.set_wall_mapper(WALL_MAPPERS[-1])
+        self.tex_mapper = None
+        if WallTextureMapper is not None:
+            self.tex_mapper = WallTextureMapper((self.render_w, self.render_h), self.atlas.stack)
+
+        # текстурированные пол/потолок (нужен numpy)
+        self.floor_caster = None
+        if FloorCaster is not None:
+            self.floor_caster = FloorCaster(
+                make_surface_texture("carpet", C.TEXTURE_SIZE, C.TEXTURE_SEED + 1, cache_dir),
+                make_surface_texture("ceiling", C.TEXTURE_SIZE, C.TEXTURE_SEED + 2, cache_dir),
+            )
+        self.set_floor_quality(C.FLOOR_QUALITY)
+
+        # отсечение спрайтов по PVS клеток
+        self.use_pvs = True
+
+        # пол+стены прошлого кадра: при той же позе камеры перерисовываются только спрайты и оверлеи
+        self.reuse_frames = True
+        self._wall_frame: Optional[pygame.Surface] = None
+        self._wall_zbuf: List[float] = []
+        self._wall_key: Optional[tuple] = None
+        self._wall_world = None
+
+        self.dynres: Optional[DynamicResolution] = None
+        self._world_drawn = False
+        # время пола, стен, двери и спрайтов кадра: только оно зависит от внутреннего разрешения
+        self._world_ms = 0.0
+
+        self.hud = HudLayer(heart_img, zachet_img)
+
+        # зерно: игра и FNAF мини-игра
+        self.grain = GrainRing(C.NOISE_DOTS, C.NOISE_INTENSITY)
+        self.fnaf_grain = GrainRing(C.FNAF_NOISE_DOTS, C.FNAF_NOISE_INTENSITY)
+
+        self._minimap_base: Optional[pygame.Surface] = None
+        self._minimap_cell = 1
+        self._minimap_world = lambda: None
+        self._minimap_key: Optional[tuple] = None
+        # маркеры миникарты: маленькие спрайты, чтобы база оставалась одной закэшированной поверхностью
+        self._minimap_marks: Dict[tuple, pygame.Surface] = {}
+
+        self.fonts = FontRegistry()
+        self.text_cache = TextCache(C.TEXT_CACHE_MB * 1024 * 1024)
+        self.font = self.fonts.get(18)
+        self.big_font = self.fonts.get(44, bold=True)
+        self.logo_font = self.fonts.get(74, bold=True)
 
         self._rebuild_overlay()
 
+    def set_render_size(self, w: int, h: int) -> None:
+        if (w, h) == (self.render_w, self.render_h):
+            return
+        self.render_w = w
+        self.render_h = h
+        self.render = pygame.Surface((w, h))
+        self._wall_frame = None
+        self._wall_key = None
+        if self.tex_mapper is not None:
+            self.tex_mapper.resize((w, h))
+        # высоты колонок и спрайтов зависят от render_h
+        self.column_cache.clear()
+        self.sprite_cache.clear()
+
+    def set_parallel(self, backend: str, strips: int) -> None:
+        if self.strip_backend is not None:
+            self.strip_backend.close()
+            self.strip_backend = None
+        self.strip_ms = []
+        if backend not in PARALLEL_BACKENDS or self.tex_mapper is None:
+            backend = "serial"
+        self.parallel = backend
+        self.strips = max(1, strips)
+        if backend != "serial":
+            self.strip_backend = create_strip_backend(backend, self.strips, self.tex_mapper.tex_stack)
+            if self.strip_backend is not None:
+                self.parallel = self.strip_backend.name
+        self._label_parallel()
+
+    def _label_parallel(self) -> None:
+        if self.strip_backend is None:
+            PERF.label("parallel", "serial")
+        elif self.wall_mapper != "surfarray":
+            # полосы пишут только в массив кадра: при blit-мэппере они простаивают
+            PERF.label("parallel", f"{self.parallel} x{self.strips} (idle: {self.wall_mapper} mapper)")
+        else:
+            PERF.label("parallel", f"{self.parallel} x{self.strips}")
+
+    def close(self) -> None:
+        if self.strip_backend is not None:
+            self.strip_backend.close()
+            self.strip_backend = None
+
+    def set_dynamic_resolution(self, enabled: bool) -> None:
+        self.dynres = DynamicResolution() if enabled else None
+        self.set_render_size(C.RENDER_W, C.RENDER_H)
+
+    def end_frame(self) -> None:
+        # учитываются только кадры, где рисовался мир
+        drew_world = self._world_drawn
+        self._world_drawn = False
+        if not drew_world or self.dynres is None:
+            return
+        size = self.dynres.sample(self._world_ms)
+        if size is not None:
+            self.set_render_size(*size)
+
     def set_screen(self, new_screen: pygame.Surface) -> None:
         self.screen = new_screen
+        self.hud.invalidate()
+        self._minimap_base = None
         self._rebuild_overlay()
 
     def _rebuild_overlay(self) -> None:
         w, h = self.screen.get_size()
-        self.vin = vignette_surface(w, h)
+        self.vin = vignette_surface(w, h, self.cache_dir)
 
     @staticmethod
     def _ru_plural(n: int, one: str, two: str, five: str) -> str:
@@ -102,71 +415,43 @@ class Renderer:
             return two
         return five
 
-    @staticmethod
-    def _text_with_outlines(
-        text: str,
-        font: pygame.font.Font,
-        inner_color: Tuple[int, int, int],
-        outline_layers: List[Tuple[Tuple[int, int, int], int]],
-    ) -> pygame.Surface:
-        base = font.render(text, True, inner_color)
-        pad = max((r for _, r in outline_layers), default=0)
-        surf = pygame.Surface((base.get_width() + pad * 2, base.get_height() + pad * 2), pygame.SRCALPHA)
-
-        for color, rad in outline_layers:
-            outline = font.render(text, True, color)
-            offsets = [
-                (-rad, 0),
-                (rad, 0),
-                (0, -rad),
-                (0, rad),
-                (-rad, -rad),
-                (-rad, rad),
-                (rad, -rad),
-                (rad, rad),
-            ]
-            for dx, dy in offsets:
-                surf.blit(outline, (pad + dx, pad + dy))
-
-        surf.blit(base, (pad, pad))
-        return surf
-
     def draw_menu(self, title: str, items: List[str], selected: int, hint: str = "", famcs_logo: bool = False) -> List[pygame.Rect]:
         w, h = self.screen.get_size()
         self.screen.fill((10, 10, 10))
 
-        tfont = pygame.font.SysFont("consolas", 46, bold=True)
-        mfont = pygame.font.SysFont("consolas", 26)
-        sfont = pygame.font.SysFont("consolas", 18)
+        tfont = self.fonts.get(46, bold=True)
+        mfont = self.fonts.get(26)
+        sfont = self.fonts.get(18)
+        text = self.text_cache
 
         title_y = int(h * 0.18)
         if famcs_logo:
-            top = tfont.render("ESCAPE FROM", True, (220, 220, 220))
+            top = text.render(tfont, "ESCAPE FROM", (220, 220, 220))
             self.screen.blit(top, (w // 2 - top.get_width() // 2, title_y - 30))
 
-            famcs = self._text_with_outlines(
-                "FAMCS",
+            famcs = text.outlined(
                 self.logo_font,
+                "FAMCS",
                 (255, 255, 255),
                 [((0, 120, 255), 4), ((255, 140, 0), 2)],
             )
             self.screen.blit(famcs, (w // 2 - famcs.get_width() // 2, title_y))
         else:
-            t = tfont.render(title, True, (220, 220, 220))
+            t = text.render(tfont, title, (220, 220, 220))
             self.screen.blit(t, (w // 2 - t.get_width() // 2, title_y))
 
         base_y = int(h * 0.36)
         rects: List[pygame.Rect] = []
         for i, it in enumerate(items):
             col = (255, 235, 120) if i == selected else (170, 170, 170)
-            s = mfont.render(it, True, col)
+            s = text.render(mfont, it, col)
             r = s.get_rect()
             r.center = (w // 2, base_y + i * 40 + 12)
             self.screen.blit(s, r.topleft)
             rects.append(r)
 
         if hint:
-            hh = sfont.render(hint, True, (130, 130, 130))
+            hh = text.render(sfont, hint, (130, 130, 130))
             self.screen.blit(hh, (w // 2 - hh.get_width() // 2, int(h * 0.88)))
 
         return rects
@@ -176,7 +461,7 @@ class Renderer:
         scaled = pygame.transform.scale(img, (w, h))
         self.screen.blit(scaled, (0, 0))
         if caption:
-            txt = self.big_font.render(caption, True, (240, 240, 240))
+            txt = self.text_cache.render(self.big_font, caption, (240, 240, 240))
             self.screen.blit(txt, (w // 2 - txt.get_width() // 2, int(h * 0.82)))
 
     # ============================================================
@@ -199,26 +484,49 @@ class Renderer:
         lives: int = 3,
         show_minimap: bool = False,
     ) -> None:
-        self.render.fill(C.CEIL_COLOR)
-        pygame.draw.rect(self.render, C.FLOOR_COLOR, (0, C.RENDER_H // 2, C.RENDER_W, C.RENDER_H // 2))
-
-        zbuffer = [1e9] * C.RENDER_W
-        self._cast_walls(world, player, zbuffer)
+        self._world_drawn = True
+        t_world = time.perf_counter()
+        zbuffer = self._reuse_walls(world, player)
+        if zbuffer is None:
+            PERF.start("floor")
+            self._draw_floor(player)
+            PERF.stop("floor")
+
+            PERF.start("walls")
+            zbuffer = [1e9] * self.render_w
+            self._cast_walls(world, player, zbuffer)
+            PERF.stop("walls")
+            self._store_walls(world, player, zbuffer)
 
         # ✅ ДВЕРЬ РИСУЕТСЯ ВСЕГДА (чтобы не исчезала после 3 зачёток)
+        PERF.start("door")
         if door_plane_pos is not None:
             self._draw_door_plane(zbuffer, player, door_plane_pos, door_orientation, dim=False)
+        PERF.stop("door")
 
+        PERF.start("sprites")
         sprites = []
 
+        # спрайты, которые целиком в невидимых из клетки игрока клетках, не рисуются;
+        # пока маска клетки не готова, отсечения нет (маски строятся в prefetch по бюджету)
+        vis = visibility_for(world) if self.use_pvs else None
+        cell = (int(player.x), int(player.y))
+        if vis is not None:
+            vis.prefetch(cell, C.PVS_BUDGET_MS)
+            if not vis.ready(*cell):
+                vis = None
+
+        def _seen(pos: Tuple[float, float], scale: float) -> bool:
+            return vis is None or vis.is_visible(cell, pos[0], pos[1], self._sprite_radius(player, pos, scale))
+
         if show_monster and not is_dead:
             t_now = pygame.time.get_ticks() / 1000.0
             for m in monsters:
-                if t_now >= m.active_time:
+                if t_now >= m.active_time and _seen((m.x, m.y), 1.10):
                     sprites.append(("monster", (m.x, m.y), self.monster_img, False, 1.10))
 
         for pos, collected in zip(zachetki, zachet_collected):
-            if not collected:
+            if not collected and _seen(pos, 1.0):
                 sprites.append(("zachet", pos, self.zachet_img, False, 1.0))
 
         def _dsq(pp: Tuple[float, float]) -> float:
@@ -230,247 +538,401 @@ class Renderer:
 
         for _, pos, tex, dim, scale in sprites:
             self._draw_billboard(zbuffer, player, pos, tex, dim=dim, scale=scale)
+        PERF.count("sprites", len(sprites))
+        PERF.stop("sprites")
+        self._world_ms = (time.perf_counter() - t_world) * 1000.0
 
+        PERF.start("present")
         w, h = self.screen.get_size()
-        frame = pygame.transform.scale(self.render, (w, h))
-        self.screen.blit(frame, (0, 0))
-        self.screen.blit(self.vin, (0, 0))
+        out = self.presenter
+        out.draw_world(self.screen, self.render)
+        out.overlay(self.screen, self.vin)
 
-        for _ in range(C.NOISE_DOTS):
-            xx = random.randrange(w)
-            yy = random.randrange(h)
-            c = random.randrange(10, 28)
-            self.screen.set_at((xx, yy), (c, c, c))
+        out.grain(self.screen, self.grain)
+        PERF.stop("present")
 
         if is_dead:
-            jump = pygame.transform.scale(self.monster_img, (w, h))
-            self.screen.blit(jump, (0, 0))
-            txt = self.big_font.render("ПЕРЕСДАЧА!", True, (240, 240, 240))
-            self.screen.blit(txt, (w // 2 - txt.get_width() // 2, int(h * 0.26)))
-            txt2 = self.font.render("Нажми R чтобы начать заново", True, (240, 240, 240))
-            self.screen.blit(txt2, (w // 2 - txt2.get_width() // 2, int(h * 0.38)))
+            out.overlay(self.screen, self.monster_img, (0, 0), (w, h))
+            txt = self.text_cache.render(self.big_font, "ПЕРЕСДАЧА!", (240, 240, 240))
+            out.overlay(self.screen, txt, (w // 2 - txt.get_width() // 2, int(h * 0.26)))
+            txt2 = self.text_cache.render(self.font, "Нажми R чтобы начать заново", (240, 240, 240))
+            out.overlay(self.screen, txt2, (w // 2 - txt2.get_width() // 2, int(h * 0.38)))
             return
 
-        # HUD
-        heart = pygame.transform.smoothscale(self.heart_img, (28, 28))
-        for i in range(max(0, lives)):
-            self.screen.blit(heart, (12 + i * 32, 12))
-
-        icon = pygame.transform.smoothscale(self.zachet_img, (34, 34))
+        # HUD: слои пересобираются только при изменении жизней/зачёток/подсказки
+        PERF.start("hud")
         total = len(zachet_collected)
-        got = sum(1 for c in zachet_collected if c)
-
-        for i in range(total):
-            mul = 255 if zachet_collected[i] else 110
-            shaded = icon.copy()
-            shaded.fill((mul, mul, mul, 255), special_flags=pygame.BLEND_MULT)
-            self.screen.blit(shaded, (12 + i * 40, 50))
-        if total:
-            txt = self.font.render(f"{got}/{total}", True, (230, 230, 230))
-            self.screen.blit(txt, (12, 90))
-
+        hint = ""
         # ✅ Подсказка у двери: сколько ещё зачёток
         if door_pos is not None and total > 0 and (not door_open):
             dist_to_door = math.hypot(player.x - door_pos[0], player.y - door_pos[1])
             if dist_to_door < 1.15:
-                remain = total - got
+                remain = total - sum(1 for c in zachet_collected if c)
                 if remain > 0:
                     word = self._ru_plural(remain, "зачётку", "зачётки", "зачёток")
-                    msg = f"Дверь закрыта. Нужно собрать ещё {remain} {word}"
-                    hint = self.font.render(msg, True, (235, 235, 235))
-                    self.screen.blit(hint, (w // 2 - hint.get_width() // 2, int(h * 0.82)))
+                    hint = f"Дверь закрыта. Нужно собрать ещё {remain} {word}"
+
+        self.hud.update((w, h), self.font, lives, zachet_collected, hint)
+        for surf, pos in self.hud.layers:
+            out.overlay(self.screen, surf, pos)
+        PERF.stop("hud")
 
         if show_minimap:
+            PERF.start("minimap")
             active_zachetki = [p for p, c in zip(zachetki, zachet_collected) if not c]
             self._draw_minimap(world, player, door_pos, active_zachetki)
+            PERF.stop("minimap")
+
+    def _wall_pass_key(self, p) -> tuple:
+        return (
+            p.x, p.y, p.dirx, p.diry, p.planex, p.planey,
+            self.render_w, self.render_h,
+            self.wall_engine, self.wall_mapper, self.floor_quality, self.parallel,
+        )
+
+    def _reuse_walls(self, world, p) -> Optional[List[float]]:
+        """Puts the stored floor+wall frame back into self.render if nothing it depends on changed."""
+        if not self.reuse_frames:
+            return None
+        if (
+            self._wall_frame is None
+            or self._wall_world is None
+            or self._wall_world() is not world
+            or self._wall_key != self._wall_pass_key(p)
+        ):
+            PERF.count("wall_reuse_miss")
+            return None
+        PERF.count("wall_reuse_hit")
+        self.render.blit(self._wall_frame, (0, 0))
+        return self._wall_zbuf
+
+    def _store_walls(self, world, p, zbuffer: List[float]) -> None:
+        if not self.reuse_frames:
+            return
+        if self._wall_frame is None:
+            self._wall_frame = pygame.Surface((self.render_w, self.render_h))
+        self._wall_frame.blit(self.render, (0, 0))
+        # дверь и спрайты zbuffer только читают
+        self._wall_zbuf = zbuffer
+        self._wall_key = self._wall_pass_key(p)
+        self._wall_world = weakref.ref(world)
+
+    def _minimap_layer(self, world) -> Tuple[pygame.Surface, int]:
+        # стены запекаются один раз на World и размер экрана
+        key = (self.screen.get_size(), world.w, world.h)
+        if self._minimap_base is not None and self._minimap_world() is world and self._minimap_key == key:
+            return self._minimap_base, self._minimap_cell
 
-    def _draw_minimap(self, world, player, door_pos, zachetki) -> None:
         target = 220
         cell = max(1, min(target // max(world.w, 1), target // max(world.h, 1)))
-        map_w = cell * world.w
-        map_h = cell * world.h
-
-        surf = pygame.Surface((map_w, map_h), pygame.SRCALPHA)
-        surf.fill((0, 0, 0, 110))
+        base = pygame.Surface((cell * world.w, cell * world.h), pygame.SRCALPHA)
+        base.fill((0, 0, 0, 110))
 
         for y in range(world.h):
             for x in range(world.w):
-                if world.is_wall_cell(x, y):
-                    pygame.draw.rect(surf, (35, 35, 35, 230), (x * cell, y * cell, cell, cell))
+                tile = world.tile_at(x, y)
+                if tile in WALL_TILES:
+                    pygame.draw.rect(base, self.atlas.minimap_color(tile), (x * cell, y * cell, cell, cell))
+
+        self._minimap_base = base
+        self._minimap_cell = cell
+        self._minimap_marks.clear()
+        self._minimap_world = weakref.ref(world)
+        self._minimap_key = key
+        return base, cell
+
+    def _minimap_mark(self, color: Tuple[int, int, int, int], radius: int, tip: Tuple[int, int] = (0, 0)) -> Tuple[pygame.Surface, int]:
+        """Marker dot (and heading line to tip) centred at (r, r) of the returned surface."""
+        key = (color, radius, tip)
+        r = radius + max(abs(tip[0]), abs(tip[1])) + 2
+        surf = self._minimap_marks.get(key)
+        if surf is None:
+            surf = pygame.Surface((2 * r + 2, 2 * r + 2), pygame.SRCALPHA)
+            surf.fill((0, 0, 0, 0))
+            pygame.draw.circle(surf, color, (r, r), radius)
+            if tip != (0, 0):
+                pygame.draw.line(surf, (255, 200, 200, 255), (r, r), (r + tip[0], r + tip[1]), 2)
+            self._minimap_marks[key] = surf
+            PERF.count("surfaces")
+        return surf, r
 
-        if door_pos is not None:
-            dx = int(door_pos[0] * cell)
-            dy = int(door_pos[1] * cell)
-            pygame.draw.circle(surf, (40, 140, 255, 240), (dx, dy), max(2, cell // 2))
+    def _draw_minimap(self, world, player, door_pos, zachetki) -> None:
+        base, cell = self._minimap_layer(world)
+        map_w, _ = base.get_size()
+        w, _ = self.screen.get_size()
+        mx, my = w - map_w - 12, 12
+        out = self.presenter
+        # база не меняется между кадрами, поэтому её текстура в SDL-презентере переиспользуется
+        out.overlay(self.screen, base, (mx, my))
 
+        radius = max(2, cell // 2)
+        marks = []
+        if door_pos is not None:
+            marks.append(((40, 140, 255, 240), door_pos, (0, 0)))
         for zpos in zachetki:
-            zx = int(zpos[0] * cell)
-            zy = int(zpos[1] * cell)
-            pygame.draw.circle(surf, (250, 200, 70, 240), (zx, zy), max(2, cell // 2))
+            marks.append(((250, 200, 70, 240), zpos, (0, 0)))
 
+        # конец линии взгляда как целый сдвиг: спрайтов игрока конечное число
         px = int(player.x * cell)
         py = int(player.y * cell)
-        pygame.draw.circle(surf, (255, 80, 80, 255), (px, py), max(2, cell // 2))
-
         dir_len = max(cell, 6)
-        pygame.draw.line(
-            surf,
-            (255, 200, 200, 255),
-            (px, py),
-            (int(px + player.dirx * dir_len), int(py + player.diry * dir_len)),
-            2,
-        )
+        tip = (int(px + player.dirx * dir_len) - px, int(py + player.diry * dir_len) - py)
+        marks.append(((255, 80, 80, 255), (player.x, player.y), tip))
 
-        w, _ = self.screen.get_size()
-        self.screen.blit(surf, (w - map_w - 12, 12))
+        for color, pos, t in marks:
+            surf, r = self._minimap_mark(color, radius, t)
+            out.overlay(self.screen, surf, (mx + int(pos[0] * cell) - r, my + int(pos[1] * cell) - r))
 
     # ============================================================
     # Raycasting
     # ============================================================
 
-    def _cast_walls(self, world, p, zbuffer: List[float]) -> None:
-        tex_w, tex_h = self.wall_tex.get_size()
-        max_steps = world.w * world.h * 4
+    def set_wall_engine(self, name: str) -> None:
+        if name not in WALL_ENGINES:
+            name = "python"
+        self.wall_engine = name
+        PERF.label("engine", name)
+
+    def cycle_wall_engine(self) -> str:
+        names = list(WALL_ENGINES)
+        idx = names.index(self.wall_engine) if self.wall_engine in names else 0
+        self.set_wall_engine(names[(idx + 1) % len(names)])
+        return self.wall_engine
+
+    def _fog_band(self, dist: float, shade_mul: float, lo: int) -> int:
+        # туман + боковое затенение, квантованные в полосы яркости (ключ кэша)
+        mul = int(255 * math.exp(-C.FOG_STRENGTH * dist * 22.0) * shade_mul)
+        mul = int(clamp(mul, lo, 255))
+        if not self.quantize:
+            return mul
+        step = 256 // C.SHADE_BANDS
+        return min(255, mul // step * step + step // 2)
+
+    def _quant_h(self, h: int) -> int:
+        if not self.quantize:
+            return h
+        step = C.COLUMN_H_STEP
+        return max(step, (h + step // 2) // step * step)
+
+    def _mips(self, tex: pygame.Surface) -> List[pygame.Surface]:
+        chain = self._mip_chains.get(id(tex))
+        if chain is None or chain[0] is not tex:
+            chain = build_mip_chain(tex)
+            self._mip_chains[id(tex)] = chain
+        return chain
+
+    def _column(self, tex: pygame.Surface, tex_x: int, height: int, mul: int) -> pygame.Surface:
+        chain = self._mips(tex)
+        src = chain[mip_level(tex.get_height(), height, len(chain))]
+        tex_x = tex_x * src.get_width() // tex.get_width()
+        key = (id(src), tex_x, height, mul)
+        col = self.column_cache.get(key)
+        if col is None:
+            col = src.subsurface((tex_x, 0, 1, src.get_height()))
+            col = pygame.transform.scale(col, (1, height))
+            col.fill((mul, mul, mul), special_flags=pygame.BLEND_MULT)
+            self.column_cache.put(key, col)
+        return col
+
+    def set_floor_quality(self, quality: str) -> None:
+        if self.floor_caster is None or quality not in FLOOR_QUALITIES:
+            quality = "off"
+        self.floor_quality = quality
+        PERF.label("floor", quality)
+
+    def cycle_floor_quality(self) -> str:
+        if self.floor_caster is None:
+            self.set_floor_quality("off")
+            return self.floor_quality
+        idx = FLOOR_QUALITIES.index(self.floor_quality) if self.floor_quality in FLOOR_QUALITIES else 0
+        self.set_floor_quality(FLOOR_QUALITIES[(idx + 1) % len(FLOOR_QUALITIES)])
+        return self.floor_quality
+
+    def _draw_floor(self, p) -> None:
+        textured = self.floor_caster is not None and self.floor_quality != "off"
+        if textured:
+            self.floor_caster.draw(self.tex_mapper.frame, p, self.floor_quality)
+            if self.wall_mapper != "surfarray":
+                self.tex_mapper.present(self.render)
+        elif self.wall_mapper == "surfarray":
+            self.tex_mapper.clear(C.CEIL_COLOR, C.FLOOR_COLOR)
+        else:
+            self.render.fill(C.CEIL_COLOR)
+            pygame.draw.rect(self.render, C.FLOOR_COLOR, (0, self.render_h // 2, self.render_w, self.render_h // 2))
 
-        px, py = p.x, p.y
-        dirx, diry = p.dirx, p.diry
-        planex, planey = p.planex, p.planey
+    def set_wall_mapper(self, name: str) -> None:
+        if name not in WALL_MAPPERS:
+            name = "blit"
+        self.wall_mapper = name
+        PERF.label("mapper", name)
+        self._label_parallel()
 
-        for x in range(C.RENDER_W):
-            cameraX = 2.0 * x / C.RENDER_W - 1.0
-            rayDirX = dirx + planex * cameraX
-            rayDirY = diry + planey * cameraX
+    def cycle_wall_mapper(self) -> str:
+        idx = WALL_MAPPERS.index(self.wall_mapper) if self.wall_mapper in WALL_MAPPERS else 0
+        self.set_wall_mapper(WALL_MAPPERS[(idx + 1) % len(WALL_MAPPERS)])
+        return self.wall_mapper
 
-            mapX = int(px)
-            mapY = int(py)
+    def _cast_walls(self, world, p, zbuffer: List[float]) -> None:
+        tex_w = self.wall_tex.get_width()
 
-            deltaDistX = abs(1.0 / rayDirX) if abs(rayDirX) > 1e-12 else 1e30
-            deltaDistY = abs(1.0 / rayDirY) if abs(rayDirY) > 1e-12 else 1e30
+        # полосы всегда идут через numpy-движок и surfarray
+        if self.strip_backend is not None and self.wall_mapper == "surfarray":
+            zbuf = np.empty(self.render_w, dtype=np.float64)
+            self.strip_ms = self.strip_backend.render(
+                world, p, self.tex_mapper.frame, zbuf, self.tex_mapper.tex_stack, tex_w
+            )
+            if PERF.enabled:
+                for i, ms in enumerate(self.strip_ms):
+                    PERF.add(f"strip{i}", ms)
+            self.tex_mapper.present(self.render)
+            zbuffer[:] = zbuf.tolist()
+            return
 
-            if rayDirX < 0:
-                stepX = -1
-                sideDistX = (px - mapX) * deltaDistX
-            else:
-                stepX = 1
-                sideDistX = (mapX + 1.0 - px) * deltaDistX
+        cast = WALL_ENGINES[self.wall_engine]
+        perp_buf, side_buf, tex_x_buf, tile_buf = cast(world, p, self.render_w, tex_w)
 
-            if rayDirY < 0:
-                stepY = -1
-                sideDistY = (py - mapY) * deltaDistY
-            else:
-                stepY = 1
-                sideDistY = (mapY + 1.0 - py) * deltaDistY
-
-            hit = False
-            side = 0
-            cell_type = "1"
-            perp = 1e9
-
-            for _ in range(max_steps):
-                if sideDistX < sideDistY:
-                    sideDistX += deltaDistX
-                    mapX += stepX
-                    side = 0
-                    traveled = sideDistX - deltaDistX
-                else:
-                    sideDistY += deltaDistY
-                    mapY += stepY
-                    side = 1
-                    traveled = sideDistY - deltaDistY
-
-                # порталы по краям (как у тебя)
-                if mapY < 0:
-                    x_at = px + rayDirX * traveled
-                    if world.portal_allows("N", x_at):
-                        mapY = world.h - 1
-                    else:
-                        hit = True
-                        cell_type = "1"
-                        perp = traveled
-                        break
-                elif mapY >= world.h:
-                    x_at = px + rayDirX * traveled
-                    if world.portal_allows("S", x_at):
-                        mapY = 0
-                    else:
-                        hit = True
-                        cell_type = "1"
-                        perp = traveled
-                        break
-
-                if mapX < 0:
-                    y_at = py + rayDirY * traveled
-                    if world.portal_allows("W", y_at):
-                        mapX = world.w - 1
-                    else:
-                        hit = True
-                        cell_type = "1"
-                        perp = traveled
-                        break
-                elif mapX >= world.w:
-                    y_at = py + rayDirY * traveled
-                    if world.portal_allows("E", y_at):
-                        mapX = 0
-                    else:
-                        hit = True
-                        cell_type = "1"
-                        perp = traveled
-                        break
-
-                cell_type = world.cell_at(mapX, mapY)
-                if cell_type in ("1", "D"):
-                    hit = True
-                    perp = traveled
-                    break
-
-            if not hit:
-                continue
+        if self.wall_mapper == "surfarray":
+            self.tex_mapper.draw_walls(perp_buf, side_buf, tex_x_buf, tile_buf)
+            self.tex_mapper.present(self.render)
+            zbuffer[:] = list(perp_buf)
+            return
 
-            perp = max(perp, C.MIN_WALL_DIST)
-            zbuffer[x] = perp
+        if not isinstance(perp_buf, list):
+            perp_buf, side_buf, tex_x_buf, tile_buf = (
+                perp_buf.tolist(), side_buf.tolist(), tex_x_buf.tolist(), tile_buf.tolist()
+            )
+        if PERF.enabled:
+            PERF.count("blits", sum(1 for t in tile_buf if t != TILE_NONE))
 
-            line_h = int(C.RENDER_H / perp)
-            line_h = min(line_h, C.RENDER_H * C.MAX_LINEHEIGHT_MULT)
+        textures = self.atlas.textures
+        for x in range(self.render_w):
+            tile = tile_buf[x]
+            if tile == TILE_NONE:
+                continue
 
-            draw_start = max(0, -line_h // 2 + C.RENDER_H // 2)
-            draw_end = min(C.RENDER_H - 1, line_h // 2 + C.RENDER_H // 2)
+            perp = perp_buf[x]
+            side = side_buf[x]
+            texX = tex_x_buf[x]
+            zbuffer[x] = perp
 
-            if side == 0:
-                wallX = py + perp * rayDirY
-            else:
-                wallX = px + perp * rayDirX
-            wallX -= math.floor(wallX)
+            line_h = int(self.render_h / perp)
+            line_h = min(line_h, self.render_h * C.MAX_LINEHEIGHT_MULT)
 
-            texX = int(wallX * tex_w)
-            if side == 0 and rayDirX > 0:
-                texX = tex_w - texX - 1
-            if side == 1 and rayDirY < 0:
-                texX = tex_w - texX - 1
-            texX = int(clamp(texX, 0, tex_w - 1))
+            draw_start = max(0, -line_h // 2 + self.render_h // 2)
+            draw_end = min(self.render_h - 1, line_h // 2 + self.render_h // 2)
 
             visible_h = draw_end - draw_start
             if visible_h <= 0:
                 continue
 
-            tex = self.door_wall_tex if cell_type == "D" else self.wall_tex
-            col = tex.subsurface((texX, 0, 1, tex_h))
-            col_scaled = pygame.transform.scale(col, (1, visible_h))
-
+            tex = textures[tile - 1]
             shade_mul = 0.78 if side == 1 else 1.0
-            fog_factor = math.exp(-C.FOG_STRENGTH * perp * 22.0)
-            mul = int(clamp(int(255 * fog_factor * shade_mul), 20, 255))
+            mul = self._fog_band(perp, shade_mul, 20)
 
-            col_scaled = col_scaled.copy()
-            col_scaled.fill((mul, mul, mul), special_flags=pygame.BLEND_MULT)
-            self.render.blit(col_scaled, (x, draw_start))
+            col_h = self._quant_h(visible_h)
+            col = self._column(tex, texX, col_h, mul)
+            self.render.blit(col, (x, draw_start - (col_h - visible_h) // 2))
+
+    def _door_span(self, p, a: Tuple[float, float], b: Tuple[float, float]) -> Optional[Tuple[int, int]]:
+        """Screen columns [x0, x1) the door segment a-b can cover, or None if it is off-screen."""
+        inv_det = 1.0 / (p.planex * p.diry - p.dirx * p.planey + 1e-9)
+        ends = []
+        for ex, ey in (a, b):
+            dx = ex - p.x
+            dy = ey - p.y
+            ends.append((inv_det * (p.diry * dx - p.dirx * dy), inv_det * (-p.planey * dx + p.planex * dy)))
+        (tx0, ty0), (tx1, ty1) = ends
+
+        # отсечение по ближней плоскости камеры
+        near = 1e-4
+        if ty0 <= near and ty1 <= near:
+            return None
+        if ty0 < near:
+            tx0 += (tx1 - tx0) * (near - ty0) / (ty1 - ty0)
+            ty0 = near
+        elif ty1 < near:
+            tx1 += (tx0 - tx1) * (near - ty1) / (ty0 - ty1)
+            ty1 = near
+
+        half_w = self.render_w / 2
+        s0 = half_w * (1.0 + tx0 / ty0)
+        s1 = half_w * (1.0 + tx1 / ty1)
+        # запас в столбец с каждой стороны: точная проверка идёт ниже
+        x0 = max(0, int(math.floor(min(s0, s1))) - 1)
+        x1 = min(self.render_w, int(math.ceil(max(s0, s1))) + 2)
+        if x0 >= x1:
+            return None
+        return x0, x1
 
     def _draw_door_plane(self, zbuffer: List[float], p, door_pos: Tuple[float, float], orientation: str, dim: bool = True) -> None:
-        tex_w, tex_h = self.door_tex.get_size()
         door_x, door_y = door_pos
         half = 0.5
 
-        for x in range(C.RENDER_W):
-            cameraX = 2.0 * x / C.RENDER_W - 1.0
+        if orientation == "vertical":
+            span = self._door_span(p, (door_x, door_y - half), (door_x, door_y + half))
+        else:
+            span = self._door_span(p, (door_x - half, door_y), (door_x + half, door_y))
+        if span is None:
+            return
+        x0, x1 = span
+
+        if np is not None:
+            hits = self._door_hits_numpy(zbuffer, p, door_pos, orientation, x0, x1)
+        else:
+            hits = self._door_hits_python(zbuffer, p, door_pos, orientation, x0, x1)
+        if not hits:
+            return
+
+        PERF.count("blits", len(hits))
+        tex_w = self.door_tex.get_width()
+        shade_mul = 0.85 if orientation == "vertical" else 0.92
+        lo = 35 if dim else 80
+
+        for x, perp, tex_coord in hits:
+            lineHeight = int(abs(self.render_h / perp))
+            lineHeight = int(clamp(lineHeight, 4, self.render_h * C.MAX_LINEHEIGHT_MULT))
+            draw_start = -lineHeight // 2 + self.render_h // 2
+            visible_h = lineHeight
+
+            texX = int(clamp(tex_coord / (half * 2) * tex_w, 0, tex_w - 1))
+            mul = self._fog_band(perp, shade_mul, lo)
+
+            col_h = self._quant_h(visible_h)
+            col = self._column(self.door_tex, texX, col_h, mul)
+            self.render.blit(col, (x, draw_start - (col_h - visible_h) // 2))
+
+    def _door_hits_numpy(self, zbuffer: List[float], p, door_pos: Tuple[float, float], orientation: str, x0: int, x1: int) -> List[Tuple[int, float, float]]:
+        door_x, door_y = door_pos
+        half = 0.5
+
+        cameraX = 2.0 * np.arange(x0, x1, dtype=np.float64) / self.render_w - 1.0
+        rayDirX = p.dirx + p.planex * cameraX
+        rayDirY = p.diry + p.planey * cameraX
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            if orientation == "vertical":
+                ok = np.abs(rayDirX) >= 1e-6
+                t = (door_x - p.x) / rayDirX
+                tex_coord = p.y + t * rayDirY - (door_y - half)
+            else:
+                ok = np.abs(rayDirY) >= 1e-6
+                t = (door_y - p.y) / rayDirY
+                tex_coord = p.x + t * rayDirX - (door_x - half)
+
+            perp = np.maximum(t - 1e-4, 1e-4)
+            ok &= (t > 0) & (tex_coord >= 0) & (tex_coord <= half * 2)
+            ok &= perp <= np.asarray(zbuffer[x0:x1]) + 1e-6
+
+        cols = np.nonzero(ok)[0]
+        return list(zip((cols + x0).tolist(), perp[cols].tolist(), tex_coord[cols].tolist()))
+
+    def _door_hits_python(self, zbuffer: List[float], p, door_pos: Tuple[float, float], orientation: str, x0: int, x1: int) -> List[Tuple[int, float, float]]:
+        door_x, door_y = door_pos
+        half = 0.5
+        hits = []
+
+        for x in range(x0, x1):
+            cameraX = 2.0 * x / self.render_w - 1.0
             rayDirX = p.dirx + p.planex * cameraX
             rayDirY = p.diry + p.planey * cameraX
 
@@ -478,14 +940,12 @@ class Renderer:
                 if abs(rayDirX) < 1e-6:
                     continue
                 t = (door_x - p.x) / rayDirX
-                hit_y = p.y + t * rayDirY
-                tex_coord = hit_y - (door_y - half)
+                tex_coord = p.y + t * rayDirY - (door_y - half)
             else:
                 if abs(rayDirY) < 1e-6:
                     continue
                 t = (door_y - p.y) / rayDirY
-                hit_x = p.x + t * rayDirX
-                tex_coord = hit_x - (door_x - half)
+                tex_coord = p.x + t * rayDirX - (door_x - half)
 
             if t <= 0:
                 continue
@@ -493,27 +953,21 @@ class Renderer:
                 continue
 
             perp = max(t - 1e-4, 1e-4)
-            lineHeight = int(abs(C.RENDER_H / perp))
-            lineHeight = int(clamp(lineHeight, 4, C.RENDER_H * C.MAX_LINEHEIGHT_MULT))
-            draw_start = -lineHeight // 2 + C.RENDER_H // 2
-            draw_end = draw_start + lineHeight
-            visible_h = draw_end - draw_start
-            if visible_h <= 0:
+            if perp > zbuffer[x] + 1e-6:
                 continue
+            hits.append((x, perp, tex_coord))
 
-            texX = int(clamp(tex_coord / (half * 2) * tex_w, 0, tex_w - 1))
-            col = self.door_tex.subsurface((texX, 0, 1, tex_h))
-            col_scaled = pygame.transform.scale(col, (1, visible_h))
-
-            shade_mul = 0.85 if orientation == "vertical" else 0.92
-            fog_factor = math.exp(-C.FOG_STRENGTH * perp * 22.0)
-            mul = int(255 * fog_factor * shade_mul)
-            mul = int(clamp(mul, 35 if dim else 80, 255))
-            col_scaled = col_scaled.copy()
-            col_scaled.fill((mul, mul, mul), special_flags=pygame.BLEND_MULT)
+        return hits
 
-            if perp <= zbuffer[x] + 1e-6:
-                self.render.blit(col_scaled, (x, draw_start))
+    def _sprite_radius(self, p, spr_pos: Tuple[float, float], scale: float) -> float:
+        """Upper bound of the billboard half-width in cells, with the size clamp and step of _draw_billboard."""
+        inv_det = 1.0 / (p.planex * p.diry - p.dirx * p.planey + 1e-9)
+        transformY = inv_det * (-p.planey * (spr_pos[0] - p.x) + p.planex * (spr_pos[1] - p.y))
+        if transformY <= 0.06:
+            return 0.5
+        sprite_w = clamp(self.render_h / transformY * scale, 6, self.render_h * 2) + C.SPRITE_H_STEP
+        # один пиксель экрана на глубине transformY — 2 * |plane| * transformY / render_w клетки
+        return sprite_w * math.hypot(p.planex, p.planey) * transformY / self.render_w
 
     def _draw_billboard(self, zbuffer: List[float], p, spr_pos: Tuple[float, float], tex: pygame.Surface, dim: bool = False, scale: float = 1.0) -> None:
         sprX = spr_pos[0] - p.x
@@ -526,38 +980,54 @@ class Renderer:
         if transformY <= 0.06:
             return
 
-        screen_x = int((C.RENDER_W / 2) * (1 + transformX / transformY))
+        screen_x = int((self.render_w / 2) * (1 + transformX / transformY))
 
-        sprite_h = int(abs(C.RENDER_H / transformY) * scale)
-        sprite_h = int(clamp(sprite_h, 6, C.RENDER_H * 2))
+        sprite_h = int(abs(self.render_h / transformY) * scale)
+        sprite_h = int(clamp(sprite_h, 6, self.render_h * 2))
+        step = C.SPRITE_H_STEP
+        sprite_h = max(step, (sprite_h + step // 2) // step * step)
         sprite_w = sprite_h
 
-        start_y = -sprite_h // 2 + C.RENDER_H // 2
+        start_y = -sprite_h // 2 + self.render_h // 2
         end_y = start_y + sprite_h
         start_x = -sprite_w // 2 + screen_x
         end_x = start_x + sprite_w
 
         clip_sy = max(0, start_y)
-        clip_ey = min(C.RENDER_H, end_y)
+        clip_ey = min(self.render_h, end_y)
         if clip_ey <= clip_sy:
             return
         offset_y = clip_sy - start_y
         vis_h = clip_ey - clip_sy
 
-        tex_scaled = pygame.transform.smoothscale(tex, (sprite_w, sprite_h))
-        fog_factor = math.exp(-C.FOG_STRENGTH * transformY * 22.0)
-        mul = int(255 * fog_factor)
-        mul = int(clamp(mul, 80 if dim else 120, 255))
-        tex_scaled = tex_scaled.copy()
-        tex_scaled.fill((mul, mul, mul), special_flags=pygame.BLEND_MULT)
-
         clip_sx = max(0, start_x)
-        clip_ex = min(C.RENDER_W, end_x)
+        clip_ex = min(self.render_w, end_x)
+        if clip_ex <= clip_sx:
+            return
 
-        for stripe in range(clip_sx, clip_ex):
-            if transformY >= zbuffer[stripe]:
-                continue
-            tx = stripe - start_x
-            if 0 <= tx < sprite_w:
-                col = tex_scaled.subsurface((tx, offset_y, 1, vis_h))
-                self.render.blit(col, (stripe, clip_sy))
+        mul = self._fog_band(transformY, 1.0, 80 if dim else 120)
+        tex_scaled = self._scaled_sprite(tex, sprite_h, mul)
+
+        # видимые по z-буферу столбцы склеиваем в полосы: один blit на полосу
+        run_start = -1
+        for stripe in range(clip_sx, clip_ex + 1):
+            visible = stripe < clip_ex and transformY < zbuffer[stripe]
+            if visible:
+                if run_start < 0:
+                    run_start = stripe
+            elif run_start >= 0:
+                area = (run_start - start_x, offset_y, stripe - run_start, vis_h)
+                self.render.blit(tex_scaled, (run_start, clip_sy), area)
+                PERF.count("blits")
+                run_start = -1
+
+    def _scaled_sprite(self, tex: pygame.Surface, size: int, mul: int) -> pygame.Surface:
+        key = (id(tex), size, mul)
+        surf = self.sprite_cache.get(key)
+        if surf is None:
+            chain = self._mips(tex)
+            src = chain[mip_level(tex.get_height(), size, len(chain))]
+            surf = pygame.transform.smoothscale(src, (size, size))
+            surf.fill((mul, mul, mul), special_flags=pygame.BLEND_MULT)
+            self.sprite_cache.put(key, surf)
+        return surf
@@ -0,0 +1,276 @@
+# replay.py
+"""
+Input recording / deterministic replay of PlayState.
+
+Record:  python main.py --record run.rec
+Replay:  python replay.py run.rec [--render] [--assert-realtime [FACTOR]] [--json out.json]
+
+The file is a gzip stream: a header, then SYNC records (full PlayState
+snapshot incl. the map grid and the RNG seed, written whenever a run starts,
+respawns or play resumes) and FRAME records (dt, t, key bitmask, mouse dx,
+CRC of the simulated state after the update).
+
+--assert-realtime fails the run (exit code 1) when replaying, with --render
+drawing every frame, is slower than FACTOR x real time (default 1.0).
+"""
+import argparse
+import gzip
+import json
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+import pygame
+
+from states import PlayState
+from world import MapSpec, World
+
+MAGIC = b"EFFREC"
+VERSION = 1
+
+TAG_SYNC = 1
+TAG_FRAME = 2
+
+_HEADER = struct.Struct("<6sBQ")
+_FRAME = struct.Struct("<ddHdI")
+_LEN = struct.Struct("<I")
+
+# клавиши, которые читает PlayState.update (порядок = биты маски)
+REPLAY_KEYS: Tuple[int, ...] = (
+    pygame.K_w, pygame.K_a, pygame.K_s, pygame.K_d,
+    pygame.K_LEFT, pygame.K_RIGHT, pygame.K_LSHIFT, pygame.K_RSHIFT,
+)
+
+
+def keys_mask(pressed: Any) -> int:
+    mask = 0
+    for bit, key in enumerate(REPLAY_KEYS):
+        if pressed[key]:
+            mask |= 1 << bit
+    return mask
+
+
+class ReplayKeys:
+    """Stands in for pygame.key.get_pressed() with a recorded bitmask."""
+
+    _BITS = {key: 1 << bit for bit, key in enumerate(REPLAY_KEYS)}
+
+    def __init__(self, mask: int) -> None:
+        self.mask = mask
+
+    def __getitem__(self, key: int) -> bool:
+        return bool(self.mask & self._BITS.get(key, 0))
+
+
+def state_crc(ps: PlayState) -> int:
+    vals = [ps.player.x, ps.player.y, ps.player.dirx, ps.player.diry, ps._mouse_smooth]
+    for m in ps.monsters:
+        vals += [m.x, m.y]
+    data = struct.pack(f"<{len(vals)}d", *vals) + bytes([ps.lives & 0xFF]) + bytes(ps.zachet_collected)
+    return zlib.crc32(data)
+
+
+def snapshot(ps: PlayState, seed: int, invert_mouse_x: bool) -> Dict[str, Any]:
+    return {
+        "seed": seed,
+        "invert_mouse_x": invert_mouse_x,
+        "state": ps.serialize(),
+        "grid": ps.world.rows(),
+        "wrap_portals": [list(p) for p in ps.world.wrap_portals],
+        # чего нет в serialize(), но влияет на update
+        "targets": [list(m.target) if m.target is not None else None for m in ps.monsters],
+        "play_state": ps.state,
+        "dead_time": ps.dead_time,
+        "door_trigger_armed": ps._door_trigger_armed,
+        "mouse_smooth": ps._mouse_smooth,
+        "monster_count": ps.monster_count,
+    }
+
+
+def apply_snapshot(ps: PlayState, snap: Dict[str, Any]) -> None:
+    ps.load_from_data(snap["state"])
+    # сгенерированные карты зависят от сида при импорте — берём сетку из записи
+    ps.world = World(MapSpec(grid=list(snap["grid"]), wrap_portals=tuple(tuple(p) for p in snap["wrap_portals"])))
+    for m, target in zip(ps.monsters, snap["targets"]):
+        m.target = tuple(target) if target is not None else None
+    ps.state = snap["play_state"]
+    ps.dead_time = snap["dead_time"]
+    ps._door_trigger_armed = snap["door_trigger_armed"]
+    ps._mouse_smooth = snap["mouse_smooth"]
+    ps.monster_count = snap["monster_count"]
+
+
+class Recorder:
+    """Hooked around PlayState.update by App.run; other states are not recorded."""
+
+    def __init__(self, path: str, seed: Optional[int] = None) -> None:
+        self.seed = seed if seed is not None else int.from_bytes(os.urandom(4), "little")
+        self._f = gzip.open(path, "wb")
+        self._f.write(_HEADER.pack(MAGIC, VERSION, self.seed))
+        self._synced: Optional[Tuple[int, int]] = None
+        self._syncs = 0
+        self._pending: Optional[Tuple[PlayState, float, float, int, float]] = None
+        self.frames = 0
+
+    def before_update(self, app, state, dt: float, t: float) -> None:
+        if not isinstance(state, PlayState):
+            self._synced = None
+            return
+
+        key = (id(state), state.run_id)
+        if key != self._synced:
+            seed = (self.seed + self._syncs) & 0xFFFFFFFF
+            self._syncs += 1
+            random.seed(seed)
+            data = json.dumps(snapshot(state, seed, app.cfg.invert_mouse_x)).encode("utf-8")
+            self._f.write(bytes([TAG_SYNC]) + _LEN.pack(len(data)) + data)
+            self._synced = key
+
+        self._pending = (state, dt, t, keys_mask(state.key_source()), state._mouse_dx)
+
+    def after_update(self) -> None:
+        if self._pending is None:
+            return
+        state, dt, t, keys, mouse_dx = self._pending
+        self._pending = None
+        self._f.write(bytes([TAG_FRAME]) + _FRAME.pack(dt, t, keys, mouse_dx, state_crc(state)))
+        self.frames += 1
+        # респавн/смерть внутри update — следующий кадр начнётся с SYNC
+        if (id(state), state.run_id) != self._synced:
+            self._synced = None
+
+    def close(self) -> None:
+        if self._f is not None:
+            self._f.close()
+            self._f = None
+
+
+def read_records(path: str) -> Iterator[Tuple[int, Any]]:
+    with gzip.open(path, "rb") as f:
+        magic, version, _seed = _HEADER.unpack(f.read(_HEADER.size))
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path}: not a replay file (or unsupported version {version})")
+        while True:
+            tag = f.read(1)
+            if not tag:
+                return
+            if tag[0] == TAG_SYNC:
+                (n,) = _LEN.unpack(f.read(_LEN.size))
+                yield TAG_SYNC, json.loads(f.read(n).decode("utf-8"))
+            elif tag[0] == TAG_FRAME:
+                yield TAG_FRAME, _FRAME.unpack(f.read(_FRAME.size))
+            else:
+                raise ValueError(f"{path}: bad record tag {tag[0]}")
+
+
+def replay(app, path: str, render: bool = False) -> Dict[str, Any]:
+    """Feeds the file through PlayState.update as fast as possible."""
+    ps: Optional[PlayState] = None
+    frames = skipped = mismatches = 0
+    first_mismatch = -1
+    sim_time = 0.0
+    draw_ms = 0.0
+
+    t0 = time.perf_counter()
+    for tag, rec in read_records(path):
+        if tag == TAG_SYNC:
+            ps = PlayState()
+            ps.initialized = True
+            app.change_state(ps)
+            apply_snapshot(ps, rec)
+            random.seed(rec["seed"])
+            app.cfg.invert_mouse_x = bool(rec["invert_mouse_x"])
+            continue
+
+        dt, t, keys, mouse_dx, crc = rec
+        if ps is None or app.state is not ps:
+            # игрок умер/ушёл в мини-игру — ждём следующий SYNC
+            skipped += 1
+            continue
+
+        replay_keys = ReplayKeys(keys)
+        ps.key_source = lambda: replay_keys
+        ps._mouse_dx = mouse_dx
+        ps.update(app, dt, t)
+        sim_time += dt
+
+        if state_crc(ps) != crc:
+            mismatches += 1
+            if first_mismatch < 0:
+                first_mismatch = frames
+        frames += 1
+
+        if render and app.state is ps:
+            d0 = time.perf_counter()
+            ps.draw(app)
+            app.presenter.flip(app.screen)
+            draw_ms += (time.perf_counter() - d0) * 1000.0
+        pygame.event.pump()
+
+    wall = time.perf_counter() - t0
+    return {
+        "frames": frames,
+        "skipped": skipped,
+        "mismatches": mismatches,
+        "first_mismatch": first_mismatch,
+        "sim_seconds": sim_time,
+        "wall_seconds": wall,
+        "speedup": sim_time / wall if wall > 0 else 0.0,
+        "draw_ms_per_frame": draw_ms / frames if (render and frames) else 0.0,
+    }
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Replay a recorded PlayState session")
+    ap.add_argument("path")
+    ap.add_argument("--render", action="store_true", help="draw every replayed frame")
+    ap.add_argument("--window", action="store_true", help="open a real window instead of the dummy video driver")
+    ap.add_argument("--json", default="", help="write the result as JSON")
+    ap.add_argument(
+        "--assert-realtime",
+        type=float,
+        nargs="?",
+        const=1.0,
+        default=0.0,
+        metavar="FACTOR",
+        help="exit with 1 if the replay runs slower than FACTOR x real time (default 1.0)",
+    )
+    args = ap.parse_args(argv)
+
+    if not args.window:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    from app import App
+    from settings import RuntimeConfig
+
+    cfg = RuntimeConfig(fullscreen=False, dynamic_resolution=False, music_volume=0.0, sfx_volume=0.0)
+    app = App(cfg)
+    result = replay(app, args.path, render=args.render)
+    app.renderer.close()
+
+    print(
+        f"{result['frames']} frames ({result['skipped']} skipped), "
+        f"{result['sim_seconds']:.1f}s of play in {result['wall_seconds']:.2f}s "
+        f"(x{result['speedup']:.1f}), mismatches: {result['mismatches']}"
+    )
+    if args.render:
+        print(f"draw + present: {result['draw_ms_per_frame']:.2f} ms/frame")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(result, f, indent=2)
+
+    slow = args.assert_realtime > 0.0 and result["speedup"] < args.assert_realtime
+    if slow:
+        print(f"FAIL: x{result['speedup']:.2f} real time, required x{args.assert_realtime:.2f}")
+
+    pygame.quit()
+    return 1 if (result["mismatches"] or slow) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -21,6 +21,12 @@ class Const:
     RENDER_H: int = 180
     FPS: int = 60
 
+    # Simulation: фиксированный шаг, рендер интерполирует позы
+    SIM_HZ: int = 60
+    SIM_MAX_STEPS: int = 5  # шагов за кадр, остаток накопителя отбрасывается
+    SIM_MAX_FRAME_DT: float = 0.25
+    INTERP_SNAP_DIST: float = 1.0  # телепорт (портал/респавн) — без интерполяции
+
     # Music / audio
     MENU_MUSIC_FILE: str = "audio/menu.wav"
     AMBIENT_FILE: str = "audio/ambient.wav"
@@ -50,9 +56,11 @@ class Const:
     FOG_STRENGTH: float = 0.055
     CEIL_COLOR: Tuple[int, int, int] = (205, 195, 120)
     FLOOR_COLOR: Tuple[int, int, int] = (115, 105, 75)
+    FLOOR_QUALITY: str = "high"  # "off" | "low" | "high"
 
     # Textures / resources
     TEXTURE_SIZE: int = 256
+    TEXTURE_SEED: int = 1337
     MONSTER_FILE: str = "img/trush.jpg"
     END_IMG: str = "img/end.jpg"
     VICTORY_IMG: str = "img/victory.jpg"
@@ -73,8 +81,40 @@ class Const:
     MIN_WALL_DIST: float = 0.18
     MAX_LINEHEIGHT_MULT: int = 4
 
-    # UI noise
+    # Wall column cache (pre-scaled, pre-shaded columns)
+    COLUMN_CACHE_MB: int = 24
+    COLUMN_H_STEP: int = 2
+    SHADE_BANDS: int = 32
+
+    # Sprite scale cache
+    SPRITE_CACHE_MB: int = 16
+    SPRITE_H_STEP: int = 4
+    MIP_MIN_SIZE: int = 8  # самый мелкий уровень мипа (стены, дверь, спрайты)
+
+    # Rendered text cache
+    TEXT_CACHE_MB: int = 8
+
+    # UI noise (film grain ring)
     NOISE_DOTS: int = 80
+    NOISE_INTENSITY: Tuple[int, int] = (10, 27)
+    FNAF_NOISE_DOTS: Tuple[int, int] = (150, 300)
+    FNAF_NOISE_INTENSITY: Tuple[int, int] = (10, 38)
+    GRAIN_FRAMES: int = 12
+    GRAIN_TILE: int = 256  # сторона тайла зерна, кольцо не зависит от разрешения
+
+    # Potentially visible set (sprite culling)
+    PVS_BUDGET_MS: float = 1.0  # на достройку масок соседних клеток за кадр
+    PVS_PREFETCH_RADIUS: int = 2
+
+    # Dynamic resolution (scale of RENDER_W x RENDER_H)
+    DYNRES_MIN_SCALE: float = 0.5
+    DYNRES_MAX_SCALE: float = 1.0
+    DYNRES_SCALE_STEP: float = 0.125
+    DYNRES_WINDOW: int = 30  # кадров в окне усреднения
+    DYNRES_WORLD_SHARE: float = 0.6  # доля бюджета кадра на пол, стены и спрайты
+    DYNRES_DOWN_AT: float = 0.95  # доля этого бюджета, выше — понижаем
+    DYNRES_UP_AT: float = 0.70  # ниже — повышаем
+    DYNRES_UP_COOLDOWN: int = 90  # кадров после смены размера до повышения
 
 
 C = Const()
@@ -85,6 +125,15 @@ class RuntimeConfig:
     fullscreen: bool = True
     window_size: Tuple[int, int] = (960, 540)
     invert_mouse_x: bool = False
+    # "software" = transform.scale на CPU, "sdl2" = текстуры pygame._sdl2.video
+    present_backend: str = "software"
+    # выключено по умолчанию: включается в settings.json
+    dynamic_resolution: bool = False
+    # "serial" | "threads" | "processes", стены полосами по столбцам
+    parallel_backend: str = "serial"
+    render_strips: int = 4
+    # без ограничения FPS рендер идёт на максимуме, симуляция всё равно SIM_HZ
+    uncapped_fps: bool = False
 
     music_volume: float = 0.10
     sfx_volume: float = 1.00
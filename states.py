@@ -3,14 +3,16 @@ from __future__ import annotations
 
 import math
 import random
+from dataclasses import replace
 from typing import Any, Dict, List, Optional, Tuple, TYPE_CHECKING
 
 import pygame
 
 from settings import C, clamp
 from world import World, MAP_VARIANTS
-from entities import Player, Monster
+from entities import Player, Monster, interpolate_player
 from pathfinding import compute_dist_map, pick_next_cell_for_monster, DIRS4
+from perf import PERF
 
 if TYPE_CHECKING:
     from app import App
@@ -40,8 +42,7 @@ class MenuState(State):
         self.item_rects: List[pygame.Rect] = []
 
     def on_enter(self, app: "App") -> None:
-        pygame.event.set_grab(False)
-        pygame.mouse.set_visible(True)
+        app.set_mouse_captured(False)
         app.audio.stop_drone()
         app.audio.play_menu_music()
 
@@ -100,8 +101,7 @@ class SettingsState(State):
         self.item_rects: List[pygame.Rect] = []
 
     def on_enter(self, app: "App") -> None:
-        pygame.event.set_grab(False)
-        pygame.mouse.set_visible(True)
+        app.set_mouse_captured(False)
         app.audio.stop_drone()
         app.audio.play_menu_music()
 
@@ -118,7 +118,7 @@ class SettingsState(State):
             for i, r in enumerate(self.item_rects):
                 if r.collidepoint(mx, my):
                     self._set_selected(app, i)
-                    if self.sel in (0, 1, 5):
+                    if self.sel in (0, 1, 5, 6):
                         self._toggle(app)
                     else:
                         direction = +1 if event.button == 1 else -1
@@ -129,9 +129,9 @@ class SettingsState(State):
             return
 
         if event.key in (pygame.K_UP, pygame.K_w):
-            self._set_selected(app, (self.sel - 1) % 6)
+            self._set_selected(app, (self.sel - 1) % 7)
         elif event.key in (pygame.K_DOWN, pygame.K_s):
-            self._set_selected(app, (self.sel + 1) % 6)
+            self._set_selected(app, (self.sel + 1) % 7)
         elif event.key in (pygame.K_LEFT, pygame.K_a):
             self._change(app, -1)
         elif event.key in (pygame.K_RIGHT, pygame.K_d):
@@ -173,6 +173,9 @@ class SettingsState(State):
             new_sv = clamp(cfg.sfx_volume + direction * step, 0.0, 1.0)
             changed = new_sv != cfg.sfx_volume
             cfg.sfx_volume = new_sv
+        elif self.sel == 5:
+            cfg.uncapped_fps = not cfg.uncapped_fps
+            changed = True
 
         if changed:
             app.audio.play_ui_click()
@@ -191,6 +194,9 @@ class SettingsState(State):
             app.apply_video_settings()
             changed = True
         elif self.sel == 5:
+            cfg.uncapped_fps = not cfg.uncapped_fps
+            changed = True
+        elif self.sel == 6:
             app.audio.play_ui_click()
             app.change_state(MenuState())
             return
@@ -210,6 +216,7 @@ class SettingsState(State):
             f"Resolution: {app.cfg.window_size[0]}x{app.cfg.window_size[1]}{' (only windowed)' if app.cfg.fullscreen else ''}",
             f"Music volume: {mv}%",
             f"SFX volume: {sv}%",
+            f"FPS limit: {'OFF' if app.cfg.uncapped_fps else C.FPS}",
             "Back",
         ]
 
@@ -252,9 +259,19 @@ class PlayState(State):
         self._mouse_dx = 0.0
         self._mouse_smooth = 0.0
 
+        # откуда update берёт клавиши (replay подставляет записанные)
+        self.key_source = pygame.key.get_pressed
+        # меняется при каждом новом забеге/респавне/загрузке (для записи replay)
+        self.run_id = 0
+
+        # позы до последнего шага симуляции — draw интерполирует к текущим
+        self._prev_player: Optional[Player] = None
+        self._prev_monsters: List[Tuple[float, float]] = []
+        self._prev_run_id = -1
+        self._prev_tick = -1
+
     def on_enter(self, app: "App") -> None:
-        pygame.event.set_grab(True)
-        pygame.mouse.set_visible(False)
+        app.set_mouse_captured(True)
         pygame.mouse.get_rel()
         app.audio.stop_menu_music()
         app.audio.start_drone()
@@ -263,8 +280,7 @@ class PlayState(State):
             self.initialized = True
 
     def on_exit(self, app: "App") -> None:
-        pygame.event.set_grab(False)
-        pygame.mouse.set_visible(True)
+        app.set_mouse_captured(False)
         app.audio.stop_drone()
 
     def start_new_run(self, app: "App") -> None:
@@ -313,7 +329,7 @@ class PlayState(State):
                 self.zachetki.append(pick_reachable(prefer, [self.spawn_point, self.door_trigger] + self.zachetki))
 
             sanity_map = compute_dist_map(
-                self.world, spawn_cell[0], spawn_cell[1], lambda mx, my: self.world.cell_at(mx, my) == "1"
+                self.world, spawn_cell[0], spawn_cell[1], self.world.is_wall_cell
             )
             targets = [self.door_trigger, *self.zachetki]
             if any(sanity_map[int(ty)][int(tx)] == -1 for tx, ty in targets):
@@ -330,6 +346,7 @@ class PlayState(State):
         raise RuntimeError("Failed to generate reachable layout")
 
     def _respawn(self, app: "App", reset_zachetka: bool = False) -> None:
+        self.run_id += 1
         self.player.x, self.player.y = self.spawn_point
         self.player.dirx, self.player.diry = 1.0, 0.0
         self.player.planex, self.player.planey = 0.0, C.FOV_PLANE
@@ -452,6 +469,14 @@ class PlayState(State):
                 self.start_new_run(app)
             elif event.key == pygame.K_m:
                 app.show_minimap = not app.show_minimap
+            elif event.key == pygame.K_F2:
+                # переключение движка рейкаста (для сравнения скорости), виден в F3
+                app.renderer.cycle_wall_engine()
+            elif event.key == pygame.K_F4:
+                app.renderer.cycle_wall_mapper()
+            elif event.key == pygame.K_F5:
+                # качество пола; режим и время floor/walls видны в F3
+                app.renderer.cycle_floor_quality()
 
     def _handle_pickups(self, app: "App") -> None:
         for i, pos in enumerate(self.zachetki):
@@ -479,7 +504,12 @@ class PlayState(State):
         app.change_state(DeathScreamerState(self))
 
     def update(self, app: "App", dt: float, t: float) -> None:
-        keys = pygame.key.get_pressed()
+        self._prev_player = replace(self.player)
+        self._prev_monsters = [(m.x, m.y) for m in self.monsters]
+        self._prev_run_id = self.run_id
+        self._prev_tick = app.sim_tick
+
+        keys = self.key_source()
 
         mx = self._mouse_dx
         self._mouse_dx = 0.0
@@ -534,8 +564,11 @@ class PlayState(State):
             return
 
         px_cell, py_cell = int(self.player.x), int(self.player.y)
+        PERF.start("dist_map")
         dist_map = compute_dist_map(self.world, px_cell, py_cell, self.world.is_blocking_cell)
+        PERF.stop("dist_map")
 
+        PERF.start("monsters")
         min_dist = 999
         for m in self.monsters:
             if t < m.active_time:
@@ -579,8 +612,10 @@ class PlayState(State):
                 m.target = None
 
             if math.hypot(self.player.x - m.x, self.player.y - m.y) < C.KILL_DIST:
+                PERF.stop("monsters")
                 self.lose_life(app)
                 return
+        PERF.stop("monsters")
 
         if min_dist >= 999:
             app.audio.set_game_drone_dynamic(0.12)
@@ -669,16 +704,41 @@ class PlayState(State):
         self.door_open = bool(data.get("door_open", self.door_open or all(self.zachet_collected)))
         self.monster_count = max(1, len(self.monsters))
         self.state = self.STATE_PLAY
+        self.run_id += 1
+
+    def _interpolated(self, app: "App") -> Tuple[Player, List[Monster]]:
+        alpha = app.render_alpha
+        # интерполируем, только если последний шаг симуляции был наш (не пауза/мини-игра) и без респавна
+        if (
+            self._prev_player is None
+            or self._prev_tick != app.sim_tick - 1
+            or self._prev_run_id != self.run_id
+            or alpha >= 1.0
+        ):
+            return self.player, self.monsters
+
+        player = interpolate_player(self._prev_player, self.player, alpha)
+        if len(self._prev_monsters) != len(self.monsters):
+            return player, self.monsters
+
+        monsters = []
+        for (px, py), m in zip(self._prev_monsters, self.monsters):
+            if math.hypot(m.x - px, m.y - py) > C.INTERP_SNAP_DIST:
+                monsters.append(m)
+            else:
+                monsters.append(replace(m, x=px + (m.x - px) * alpha, y=py + (m.y - py) * alpha))
+        return player, monsters
 
     def draw(self, app: "App") -> None:
         t = pygame.time.get_ticks() / 1000.0
         show_monster = any(t >= m.active_time for m in self.monsters)
         is_dead = (self.state == self.STATE_DEAD)
+        player, monsters = self._interpolated(app)
 
         app.renderer.draw_play(
             self.world,
-            self.player,
-            self.monsters,
+            player,
+            monsters,
             show_monster,
             is_dead,
             door_pos=self.door_trigger,
@@ -701,8 +761,7 @@ class PauseState(State):
         self.notice: str = ""
 
     def on_enter(self, app: "App") -> None:
-        pygame.event.set_grab(False)
-        pygame.mouse.set_visible(True)
+        app.set_mouse_captured(False)
         app.audio.stop_drone()
         app.audio.stop_menu_music()
 
@@ -776,8 +835,7 @@ class DeathScreamerState(State):
         self.start_time = 0.0
 
     def on_enter(self, app: "App") -> None:
-        pygame.event.set_grab(False)
-        pygame.mouse.set_visible(True)
+        app.set_mouse_captured(False)
         self.start_time = pygame.time.get_ticks() / 1000.0
         app.audio.stop_drone()
         app.audio.stop_menu_music()
@@ -813,8 +871,7 @@ class FnafMiniGameState(State):
         self._phone_scaled: Optional[pygame.Surface] = None
 
     def on_enter(self, app: "App") -> None:
-        pygame.event.set_grab(False)
-        pygame.mouse.set_visible(True)
+        app.set_mouse_captured(False)
 
         app.audio.stop_drone()
         app.audio.stop_menu_music()
@@ -926,11 +983,7 @@ class FnafMiniGameState(State):
         screen.fill((8, 8, 10))
 
         # зерно/шум
-        for _ in range(random.randint(150, 300)):
-            x = random.randrange(w)
-            y = random.randrange(h)
-            c = random.randint(10, 38)
-            screen.set_at((x, y), (c, c, c))
+        app.renderer.fnaf_grain.draw(screen)
 
         self._ensure_scaled_ui(app)
         if self._paper_scaled is not None:
@@ -979,10 +1032,11 @@ class FnafMiniGameState(State):
             screen.blit(flash, (0, 0))
 
         # текст
-        title = app.renderer.big_font.render("СПИСАТЬ", True, (245, 245, 245))
+        text = app.renderer.text_cache
+        title = text.render(app.renderer.big_font, "СПИСАТЬ", (245, 245, 245))
         tr = title.get_rect(midtop=(w // 2, 14))
         # обводка
-        outline = app.renderer.big_font.render("СПИСАТЬ", True, (0, 0, 0))
+        outline = text.render(app.renderer.big_font, "СПИСАТЬ", (0, 0, 0))
         for dx, dy in ((-2, 0), (2, 0), (0, -2), (0, 2)):
             screen.blit(outline, tr.move(dx, dy))
         screen.blit(title, tr)
@@ -994,7 +1048,7 @@ class FnafMiniGameState(State):
             msg = "СЕЙЧАС! ДЕРЖИ SPACE"
             col = (70, 210, 90)
 
-        hint = app.renderer.font.render(msg, True, col)
+        hint = text.render(app.renderer.font, msg, col)
         hr = hint.get_rect(midtop=(w // 2, 68))
         # фон-плашка
         pad = 10
@@ -1002,12 +1056,12 @@ class FnafMiniGameState(State):
         bg.fill((0, 0, 0, 150))
         screen.blit(bg, (hr.x - pad, hr.y - pad))
         # обводка
-        hint_o = app.renderer.font.render(msg, True, (0, 0, 0))
+        hint_o = text.render(app.renderer.font, msg, (0, 0, 0))
         for dx, dy in ((-1, 0), (1, 0), (0, -1), (0, 1)):
             screen.blit(hint_o, hr.move(dx, dy))
         screen.blit(hint, hr)
 
-        hp_txt = app.renderer.font.render(f"HP: {max(0, self.play_state.lives)}", True, (240, 240, 240))
+        hp_txt = text.render(app.renderer.font, f"HP: {max(0, self.play_state.lives)}", (240, 240, 240))
         screen.blit(hp_txt, (18, 86))
 
         # полоски
@@ -1021,7 +1075,7 @@ class FnafMiniGameState(State):
             frac = clamp(frac, 0.0, 1.0)
             pygame.draw.rect(screen, (245, 245, 245), (x, y, bar_w, bar_h), 2)
             pygame.draw.rect(screen, fill_col, (x + 2, y + 2, int((bar_w - 4) * frac), bar_h - 4))
-            txt = app.renderer.font.render(label, True, (235, 235, 235))
+            txt = text.render(app.renderer.font, label, (235, 235, 235))
             screen.blit(txt, (x, y - 22))
 
         draw_bar(x0, y_prog, self.progress, "Progress", (80, 200, 110))
@@ -1035,8 +1089,7 @@ class FnafScreamerState(State):
         self.start_time = 0.0
 
     def on_enter(self, app: "App") -> None:
-        pygame.event.set_grab(False)
-        pygame.mouse.set_visible(True)
+        app.set_mouse_captured(False)
         self.start_time = pygame.time.get_ticks() / 1000.0
         app.audio.stop_drone()
         app.audio.stop_menu_music()
@@ -1057,8 +1110,7 @@ class FnafScreamerState(State):
 
 class VictoryState(State):
     def on_enter(self, app: "App") -> None:
-        pygame.event.set_grab(False)
-        pygame.mouse.set_visible(True)
+        app.set_mouse_captured(False)
         app.audio.stop_drone()
         app.audio.stop_menu_music()
         app.audio.play_victory()
@@ -1075,8 +1127,7 @@ class VictoryState(State):
 
 class GameOverState(State):
     def on_enter(self, app: "App") -> None:
-        pygame.event.set_grab(False)
-        pygame.mouse.set_visible(True)
+        app.set_mouse_captured(False)
         app.audio.stop_drone()
         app.audio.stop_menu_music()
         app.audio.play_end()
@@ -0,0 +1,92 @@
+# surface_cache.py
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional
+
+import pygame
+
+from perf import PERF
+
+
+class SurfaceCache:
+    """
+    LRU cache of pre-built Surfaces with a memory cap (pixel bytes).
+    A named cache also counts <name>_hit / <name>_miss in PERF for the F3 panel.
+    """
+
+    def __init__(self, max_bytes: int, name: str = "") -> None:
+        self.name = name
+        self._hit_counter = name + "_hit"
+        self._miss_counter = name + "_miss"
+        self.max_bytes = max(0, int(max_bytes))
+        self._items: "OrderedDict[Hashable, pygame.Surface]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self.bytes_used = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def surface_bytes(surf: pygame.Surface) -> int:
+        w, h = surf.get_size()
+        return w * h * surf.get_bytesize() + 64
+
+    def get(self, key: Hashable) -> Optional[pygame.Surface]:
+        surf = self._items.get(key)
+        if surf is None:
+            self.misses += 1
+            if self.name:
+                PERF.count(self._miss_counter)
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        if self.name:
+            PERF.count(self._hit_counter)
+        return surf
+
+    def put(self, key: Hashable, surf: pygame.Surface) -> pygame.Surface:
+        # put() is only called for freshly built Surfaces
+        PERF.count("surfaces")
+        old = self._sizes.pop(key, None)
+        if old is not None:
+            self.bytes_used -= old
+            del self._items[key]
+
+        size = self.surface_bytes(surf)
+        self._items[key] = surf
+        self._sizes[key] = size
+        self.bytes_used += size
+
+        while self.bytes_used > self.max_bytes and len(self._items) > 1:
+            old_key, _ = self._items.popitem(last=False)
+            self.bytes_used -= self._sizes.pop(old_key)
+            self.evictions += 1
+        return surf
+
+    def clear(self) -> None:
+        self._items.clear()
+        self._sizes.clear()
+        self.bytes_used = 0
+
+    def reset_stats(self) -> None:
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "entries": len(self._items),
+            "bytes": self.bytes_used,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hit_rate(),
+        }
+
+    def __len__(self) -> int:
+        return len(self._items)
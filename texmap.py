@@ -0,0 +1,125 @@
+# texmap.py
+from typing import Dict, Tuple
+
+import numpy as np
+import pygame
+
+from mipmap import mip_rows
+from settings import C
+
+
+def map_wall_columns(
+    frame: np.ndarray,
+    tex_stack: np.ndarray,
+    perp: np.ndarray,
+    side: np.ndarray,
+    tex_x: np.ndarray,
+    tile: np.ndarray,
+    x0: int = 0,
+) -> None:
+    """
+    Writes textured, fogged wall columns into frame[x0:x0 + len(perp)].
+
+    frame is (w, h, 3) uint8 (surfarray layout), tex_stack is the packed mip
+    stack from pack_mip_stack with tex_stack[tile - 1] being the material of
+    that tile. Same geometry as the per-column blit path: the whole texture
+    column is stretched over the visible part of the wall, sampled from the
+    mip level that matches the column height.
+
+    Fog and shade are exact here, while the blit path quantizes them into
+    C.SHADE_BANDS bands and rounds column heights to C.COLUMN_H_STEP (cache
+    keys). With quantization on, the blit path is therefore only close to this
+    output: up to half a band darker or lighter, and column ends and texel rows
+    can move by one pixel, which changes single pixels strongly. With
+    Renderer.quantize off, both mappers write identical frames; that is
+    what `benchmark.py --check-mappers` verifies.
+    """
+    render_h = frame.shape[1]
+    tex_w = tex_stack.shape[1]
+    stack_h = tex_stack.shape[2]
+    tex_h = stack_h // 2
+
+    perp = np.asarray(perp, dtype=np.float64)
+    side = np.asarray(side)
+    tex_x = np.asarray(tex_x)
+    tile = np.asarray(tile)
+
+    line_h = (render_h / perp).astype(np.int64)
+    line_h = np.minimum(line_h, render_h * C.MAX_LINEHEIGHT_MULT)
+    draw_start = np.maximum(0, (-line_h) // 2 + render_h // 2)
+    draw_end = np.minimum(render_h - 1, line_h // 2 + render_h // 2)
+    visible_h = draw_end - draw_start
+
+    cols = np.nonzero((tile != 0) & (visible_h > 0))[0]
+    if cols.size == 0:
+        return
+
+    ds = draw_start[cols]
+    vh = visible_h[cols]
+
+    shade = np.where(side[cols] == 1, 0.78, 1.0)
+    fog = np.exp(-C.FOG_STRENGTH * perp[cols] * 22.0)
+    mul = np.clip((255 * fog * shade).astype(np.int64), 20, 255).astype(np.uint16)
+
+    # уровень мипа: >= 1 тексель на пиксель столбца
+    level_off, level_h, level_w = _mip_tables(tex_w, tex_h)
+    lvl = np.clip(np.floor(np.log2(tex_h / vh)).astype(np.int64), 0, len(level_h) - 1)
+    lh = level_h[lvl]
+
+    off = np.arange(render_h, dtype=np.int64)[None, :] - ds[:, None]
+    inside = (off >= 0) & (off < vh[:, None])
+    ty = np.clip(off * lh[:, None] // vh[:, None], 0, lh[:, None] - 1) + level_off[lvl][:, None]
+    tx = tex_x[cols].astype(np.int64) * level_w[lvl] // tex_w
+
+    # плоский индекс текселя: ((материал * tw) + texX) * stack_h + texY
+    base = ((tile[cols].astype(np.int64) - 1) * tex_w + tx) * stack_h
+    texels = tex_stack.reshape(-1, 3)[base[:, None] + ty]
+
+    # как BLEND_MULT: (src * mul + 255) >> 8
+    shaded = ((texels.astype(np.uint16) * mul[:, None, None] + 255) >> 8).astype(np.uint8)
+    x_idx = cols + x0
+    frame[x_idx] = np.where(inside[:, :, None], shaded, frame[x_idx])
+
+
+_mip_table_cache: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray, np.ndarray]] = {}
+
+
+def _mip_tables(tex_w: int, tex_h: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Per-level y offset, height and width in the packed stack."""
+    tables = _mip_table_cache.get((tex_w, tex_h))
+    if tables is None:
+        rows = mip_rows(tex_h)
+        widths = [tex_w]
+        for _ in rows[1:]:
+            widths.append(max(1, widths[-1] // 2))
+        tables = (
+            np.array([o for o, _ in rows], dtype=np.int64),
+            np.array([h for _, h in rows], dtype=np.int64),
+            np.array(widths, dtype=np.int64),
+        )
+        _mip_table_cache[(tex_w, tex_h)] = tables
+    return tables
+
+
+class WallTextureMapper:
+    """Draws the whole wall pass into one pixel array and writes it with a single blit_array."""
+
+    def __init__(self, size: Tuple[int, int], tex_stack: np.ndarray) -> None:
+        # упакованный стек мипов атласа (TextureAtlas.stack)
+        self.tex_stack = tex_stack
+        self.frame = np.zeros((size[0], size[1], 3), dtype=np.uint8)
+
+    def resize(self, size: Tuple[int, int]) -> None:
+        if self.frame.shape[:2] != tuple(size):
+            self.frame = np.zeros((size[0], size[1], 3), dtype=np.uint8)
+
+    def clear(self, ceil_color: Tuple[int, int, int], floor_color: Tuple[int, int, int]) -> None:
+        half = self.frame.shape[1] // 2
+        self.frame[:, :half] = ceil_color
+        self.frame[:, half:] = floor_color
+
+    def draw_walls(self, perp, side, tex_x, tile) -> None:
+        map_wall_columns(self.frame, self.tex_stack, perp, side, tex_x, tile)
+
+    def present(self, target: pygame.Surface) -> None:
+        pygame.surfarray.blit_array(target, self.frame)
@@ -0,0 +1,52 @@
+# tiles.py
+from typing import Dict, FrozenSet
+
+# Tile IDs of the map cells. 0 = open; every other ID is a material and
+# indexes the texture atlas directly (atlas texture tile - 1).
+TILE_NONE = 0
+TILE_WALL = 1
+TILE_DOOR = 2
+TILE_WALL_STAINED = 3
+TILE_WALL_VENT = 4
+TILE_WALL_EXIT = 5
+
+TILE_COUNT = 6
+
+# символ в MapSpec.grid -> ID тайла
+CELL_TILES: Dict[str, int] = {
+    "0": TILE_NONE,
+    "1": TILE_WALL,
+    "D": TILE_DOOR,
+    "2": TILE_WALL_STAINED,
+    "3": TILE_WALL_VENT,
+    "4": TILE_WALL_EXIT,
+}
+TILE_CELLS: Dict[int, str] = {t: c for c, t in CELL_TILES.items()}
+
+# варианты обычной стены: для логики игры это та же стена
+WALL_TILES: FrozenSet[int] = frozenset({TILE_WALL, TILE_WALL_STAINED, TILE_WALL_VENT, TILE_WALL_EXIT})
+BLOCKING_TILES: FrozenSet[int] = WALL_TILES | {TILE_DOOR}
+
+WALL_VARIANT_CELLS = ("2", "3", "4")
+
+# Per-cell flag bits (World.flags), looked up from the tile ID through TILE_FLAGS
+FLAG_WALL = 0x01
+FLAG_BLOCKING = 0x02
+
+
+def _flag_table() -> bytes:
+    table = bytearray(256)
+    for t in WALL_TILES:
+        table[t] |= FLAG_WALL
+    for t in BLOCKING_TILES:
+        table[t] |= FLAG_BLOCKING
+    return bytes(table)
+
+
+# 256 байт: tiles.translate(TILE_FLAGS) -> флаги всех клеток за один вызов
+TILE_FLAGS = _flag_table()
+
+
+def cell_tile(cell: str) -> int:
+    """Unknown characters are open cells, as before."""
+    return CELL_TILES.get(cell, TILE_NONE)
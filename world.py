@@ -1,11 +1,14 @@
 # world.py
 import random
 import math
+import zlib
 from dataclasses import dataclass
 from collections import deque
-from typing import List, Tuple, Any
+from typing import Dict, List, Tuple, Any
 
 from pathfinding import DIRS4
+from portals import PortalEdges
+from tiles import FLAG_BLOCKING, FLAG_WALL, TILE_CELLS, TILE_FLAGS, TILE_WALL, WALL_VARIANT_CELLS, cell_tile
 
 
 @dataclass(frozen=True)
@@ -13,6 +16,10 @@ class MapSpec:
     grid: List[str]
     wrap_portals: Tuple[Tuple[str, float, float], ...] = tuple()
 
+    def tile_rows(self) -> List[List[int]]:
+        """grid as integer tile IDs (see tiles.py)."""
+        return [[cell_tile(c) for c in row] for row in self.grid]
+
 
 BASE_MAP_VARIANTS: Tuple[MapSpec, ...] = (
     MapSpec(
@@ -130,7 +137,13 @@ def _odd(n: int) -> int:
     return n if (n % 2 == 1) else n + 1
 
 
-def generate_maze_grid(w: int, h: int, loop_chance: float = 0.07, room_attempts: int = 22) -> List[str]:
+def generate_maze_grid(
+    w: int,
+    h: int,
+    loop_chance: float = 0.07,
+    room_attempts: int = 22,
+    variant_chance: float = 0.06,
+) -> List[str]:
     w = _odd(max(w, 25))
     h = _odd(max(h, 25))
 
@@ -210,6 +223,17 @@ def generate_maze_grid(w: int, h: int, loop_chance: float = 0.07, room_attempts:
                 if g[yy][xx] == "0" and (xx, yy) not in seen:
                     g[yy][xx] = "1"
 
+    # варианты стен (пятна, вентиляция, таблички EXIT) — только там, где стену видно.
+    # Свой генератор с сидом от самого лабиринта: глобальный random (и следующие
+    # карты при том же --seed) идёт так же, как без вариантов
+    rng = random.Random(zlib.crc32("".join("".join(row) for row in g).encode("ascii")))
+    for y in range(1, h - 1):
+        for x in range(1, w - 1):
+            if g[y][x] != "1" or rng.random() > variant_chance:
+                continue
+            if any(g[y + dy][x + dx] == "0" for dx, dy in DIRS4):
+                g[y][x] = rng.choices(WALL_VARIANT_CELLS, weights=(6, 3, 1))[0]
+
     return ["".join(row) for row in g]
 
 
@@ -223,37 +247,65 @@ MAP_VARIANTS: Tuple[MapSpec, ...] = BASE_MAP_VARIANTS + tuple(generate_maze_spec
 
 
 class World:
+    """
+    The grid is stored flat, row-major (index = y * w + x): tiles holds tile IDs,
+    flags the FLAG_* bits of each cell. Cells outside the map count as walls.
+    """
+
     def __init__(self, map_spec: MapSpec) -> None:
-        self.MAP = [list(row) for row in map_spec.grid]
-        self.h = len(self.MAP)
-        self.w = len(self.MAP[0])
+        rows = map_spec.tile_rows()
+        self.h = len(rows)
+        self.w = len(rows[0])
         self.wrap_portals = list(map_spec.wrap_portals)
+        self.portals = PortalEdges(self.wrap_portals, self.w, self.h)
+        self.tiles = bytearray(t for row in rows for t in row)
+        self.flags = self.tiles.translate(TILE_FLAGS)
+        self._masks: Dict[int, bytes] = {}
 
     def portal_allows(self, direction: str, coord: float) -> bool:
-        for d, a, b in self.wrap_portals:
-            if d == direction and a <= coord <= b:
-                return True
-        return False
+        return self.portals.allows(direction, coord)
 
-    def cell_at(self, mx: int, my: int) -> str:
+    def tile_at(self, mx: int, my: int) -> int:
         if 0 <= mx < self.w and 0 <= my < self.h:
-            return self.MAP[my][mx]
-        return "1"
+            return self.tiles[my * self.w + mx]
+        return TILE_WALL
+
+    def cell_at(self, mx: int, my: int) -> str:
+        """Map character of the cell (compatibility with the old list-of-strings grid)."""
+        return TILE_CELLS[self.tile_at(mx, my)]
+
+    def rows(self) -> List[str]:
+        """The grid back as MapSpec strings."""
+        w = self.w
+        return ["".join(TILE_CELLS[t] for t in self.tiles[y * w:(y + 1) * w]) for y in range(self.h)]
 
     def is_wall_cell(self, mx: int, my: int) -> bool:
-        return self.cell_at(mx, my) == "1"
+        if 0 <= mx < self.w and 0 <= my < self.h:
+            return bool(self.flags[my * self.w + mx] & FLAG_WALL)
+        return True
 
     def is_blocking_cell(self, mx: int, my: int) -> bool:
-        cell = self.cell_at(mx, my)
-        return cell in ("1", "D")
+        if 0 <= mx < self.w and 0 <= my < self.h:
+            return bool(self.flags[my * self.w + mx] & FLAG_BLOCKING)
+        return True
+
+    def mask(self, flag: int) -> bytes:
+        """Flat 0/1 per cell: whether the cell has any of the flag bits. Built once per flag."""
+        m = self._masks.get(flag)
+        if m is None:
+            table = bytes(1 if i & flag else 0 for i in range(256))
+            m = bytes(self.flags.translate(table))
+            self._masks[flag] = m
+        return m
 
     def is_wall_at(self, x: float, y: float) -> bool:
         return self.is_blocking_cell(int(x), int(y))
 
     def collides_circle(self, x: float, y: float, r: float) -> bool:
-        for ox in (-r, r):
-            for oy in (-r, r):
-                if self.is_blocking_cell(int(x + ox), int(y + oy)):
+        w, h, flags = self.w, self.h, self.flags
+        for cx in (int(x - r), int(x + r)):
+            for cy in (int(y - r), int(y + r)):
+                if not (0 <= cx < w and 0 <= cy < h) or flags[cy * w + cx] & FLAG_BLOCKING:
                     return True
         return False
 